@@ -0,0 +1,383 @@
+import asyncio
+import logging
+import re
+import typing
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from dateutil import parser
+from functools import lru_cache
+
+from vocode.streaming.agent.base_agent import BaseAgent, RespondAgent
+from vocode.streaming.agent.chat_gpt_agent import ChatGPTAgent
+from vocode.streaming.agent.factory import AgentFactory
+from vocode.streaming.models.agent import AgentConfig, AgentType, ChatGPTAgentConfig
+from vocode.streaming.models.message import BaseMessage
+
+from config import TIMEZONE as _TZ
+from utils.appointment_utils import appointment_manager
+
+logger = logging.getLogger(__name__)
+
+# Phone/date/time extraction is one combined alternation with named groups,
+# compiled once at import: the message is scanned a single time and matches
+# are dispatched on lastgroup, instead of six separate findall passes.
+# Phone comes first so a number can't be half-eaten by the date alternative.
+_COMBINED_RE = re.compile(
+    r"(?P<phone>\b\d{3}[-.]?\d{3}[-.]?\d{4}\b)"
+    r"|(?P<date>\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|\d{1,2}[/-]\d{1,2}[/-]?\d{0,4}|today|tomorrow|next week)\b)"
+    r"|(?P<time>\b(?:\d{1,2}:\d{2}\s*(?:am|pm)|\d{1,2}\s*(?:am|pm)"
+    r"|\d{1,2}:\d{2})\b)",
+    re.IGNORECASE,
+)
+
+_NAME_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"my name is ([a-z]+(?:\s[a-z]+)?)",
+        r"this is ([a-z]+(?:\s[a-z]+)?)",
+        r"i'?m ([a-z]+(?:\s[a-z]+)?)",
+    )
+)
+
+# Intent vocabulary lives in static frozensets (one hashed membership
+# structure per intent, built once) and feeds the single alternation scan
+# below - nothing is rebuilt per message.
+_SCHEDULE_WORDS = frozenset({"schedule", "book", "appointment", "session"})
+_RESCHEDULE_WORDS = frozenset({"reschedule", "change", "move"})
+_CANCEL_WORDS = frozenset({"cancel", "remove"})
+_AVAILABILITY_WORDS = frozenset({"available", "availability", "free"})
+
+_INTENT_KEYWORDS = {
+    word: intent
+    for words, intent in (
+        (_SCHEDULE_WORDS, "schedule"),
+        (_RESCHEDULE_WORDS, "reschedule"),
+        (_CANCEL_WORDS, "cancel"),
+        (_AVAILABILITY_WORDS, "check_availability"),
+    )
+    for word in words
+}
+_INTENT_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, _INTENT_KEYWORDS)) + r")\b", re.IGNORECASE
+)
+
+
+# Constant prompt material, built once at import so the factory never has to
+# instantiate an agent (or re-allocate a kB-scale literal) per inbound call.
+_APPT_INSTRUCTIONS = """You are a friendly appointment scheduling assistant for a personal training studio.
+
+Your job is to help callers schedule, reschedule, or cancel personal training appointments.
+
+Guidelines:
+- Be warm, professional, and concise - this is a phone call.
+- Collect the caller's name, phone number, and preferred day and time.
+- Business hours are 9 AM to 6 PM, Monday through Saturday.
+- Appointments are 60 minutes by default.
+- Confirm all details back to the caller before booking.
+- If a requested slot is taken, offer the closest available alternatives.
+- Never make up availability - only offer slots you have confirmed."""
+
+_INITIAL_MSG = BaseMessage(
+    text="Thank you for calling! How can I help you with your training schedule today?"
+)
+
+
+@lru_cache(maxsize=2048)
+def _cached_parse(s: str) -> datetime:
+    """Memoized parse with an ISO-8601 fastpath.
+
+    Timestamps that round-trip through strings are always emitted with
+    isoformat(), so the C-implemented fromisoformat handles them without
+    dateutil's grammar; spoken fragments ("monday", "3 pm") still fall
+    back to dateutil, memoized because callers repeat them constantly.
+    """
+    s = s.strip()
+    try:
+        return datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        return parser.parse(s.lower())
+
+
+def _next_weekday(weekday: int):
+    """Date of the next occurrence of `weekday` (0=Monday), never today."""
+    today = datetime.now(_TZ).date()
+    return today + timedelta(days=(weekday - today.weekday()) % 7 or 7)
+
+
+# The overwhelming majority of spoken dates are one of these keywords;
+# dispatching through this dict skips the whole dateutil grammar for them.
+_DATE_KEYWORDS = {
+    "today": lambda: datetime.now(_TZ).date(),
+    "tomorrow": lambda: (datetime.now(_TZ) + timedelta(days=1)).date(),
+    "monday": lambda: _next_weekday(0),
+    "tuesday": lambda: _next_weekday(1),
+    "wednesday": lambda: _next_weekday(2),
+    "thursday": lambda: _next_weekday(3),
+    "friday": lambda: _next_weekday(4),
+    "saturday": lambda: _next_weekday(5),
+    "sunday": lambda: _next_weekday(6),
+}
+
+
+class AppointmentSchedulingAgentConfig(AgentConfig, type="agent_appointment_scheduling"):
+    pass
+
+
+# Abandoned calls must not leak contexts forever; oldest flows get evicted
+# once this many are live.
+_MAX_ACTIVE_CONTEXTS = 10000
+
+
+class _SessionCtx:
+    """Partially collected booking details for one conversation.
+
+    A slotted class (not a dict) keeps per-conversation state compact;
+    dataclass(slots=True) needs 3.10+ and we still support 3.9.
+    """
+
+    __slots__ = ("name", "phone", "date", "time")
+
+    def __init__(self):
+        self.name = None
+        self.phone = None
+        self.date = None
+        self.time = None
+
+
+# Hot-path handle to the current conversation's context: set once per turn,
+# read without dict indexing. The OrderedDict on the agent remains the
+# backing store for eviction and recovery.
+_APPT_CTX: "ContextVar[Optional[_SessionCtx]]" = ContextVar("_appt_ctx", default=None)
+
+
+class AppointmentSchedulingAgent(RespondAgent[AppointmentSchedulingAgentConfig]):
+    # Our own attributes live in slots; the compiled patterns are exposed as
+    # class attributes so the hot method does one attribute load instead of a
+    # module-global lookup, and every instance shares the same objects.
+    __slots__ = ("appointment_manager", "conversation_context")
+
+    _COMBINED = _COMBINED_RE
+    _NAME_RES = _NAME_PATTERNS
+
+    def __init__(self, agent_config: AppointmentSchedulingAgentConfig):
+        super().__init__(agent_config=agent_config)
+        self.appointment_manager = appointment_manager
+        # Per-conversation scratchpads, LRU-bounded so abandoned flows
+        # can't grow memory without limit
+        self.conversation_context: "OrderedDict[str, _SessionCtx]" = OrderedDict()
+
+    def extract_appointment_intent(self, message: str) -> dict:
+        """Pull intent + any booking details out of a user utterance."""
+        intent_match = _INTENT_RE.search(message)
+        intent = (
+            _INTENT_KEYWORDS[intent_match.group(1).lower()]
+            if intent_match
+            else "general"
+        )
+
+        extracted_dates = []
+        extracted_times = []
+        phone = None
+        for match in self._COMBINED.finditer(message):
+            kind = match.lastgroup
+            if kind == "date":
+                extracted_dates.append(match.group("date"))
+            elif kind == "time":
+                extracted_times.append(match.group("time"))
+            elif phone is None:
+                phone = match.group("phone")
+
+        name = None
+        for pattern in self._NAME_RES:
+            name_match = pattern.search(message)
+            if name_match:
+                name = name_match.group(1).strip().title()
+                break
+
+        return {
+            "intent": intent,
+            "name": name,
+            "phone": phone,
+            "dates": extracted_dates,
+            "times": extracted_times,
+        }
+
+    async def handle_schedule_request(self, extracted_info: dict, conversation_id: str) -> str:
+        ctx = _APPT_CTX.get()
+
+        if extracted_info["name"]:
+            ctx.name = extracted_info["name"]
+        if extracted_info["phone"]:
+            ctx.phone = extracted_info["phone"]
+        if extracted_info["dates"]:
+            ctx.date = extracted_info["dates"][0]
+        if extracted_info["times"]:
+            ctx.time = extracted_info["times"][0]
+
+        if ctx.name is None:
+            return "I'd be happy to schedule an appointment for you. What's your name?"
+        if ctx.phone is None:
+            return f"Thanks {ctx.name}! What's the best phone number to reach you?"
+        if ctx.date is None:
+            return "What day would you like to come in?"
+        if ctx.time is None:
+            return "What time works best for you?"
+
+        try:
+            date_str = ctx.date
+            keyword_fn = _DATE_KEYWORDS.get(date_str.lower())
+            if keyword_fn is not None:
+                appointment_date = keyword_fn()
+            else:
+                appointment_date = (await asyncio.to_thread(_cached_parse, date_str)).date()
+
+            appointment_time = (await asyncio.to_thread(_cached_parse, ctx.time)).time()
+            appointment_datetime = datetime.combine(appointment_date, appointment_time)
+
+            client_id = await asyncio.to_thread(
+                self.appointment_manager.upsert_client, ctx.name, ctx.phone
+            )
+
+            appointment_id = await asyncio.to_thread(
+                self.appointment_manager.create_appointment,
+                client_id,
+                appointment_datetime,
+            )
+            if appointment_id:
+                del self.conversation_context[conversation_id]
+                return (
+                    f"Perfect! I've scheduled your appointment for "
+                    f"{appointment_datetime.strftime('%A, %B %d at %I:%M %p')}. "
+                    f"You'll receive a reminder call the day before. See you then!"
+                )
+            return "I'm sorry, I had trouble scheduling that appointment. Could you try again?"
+        except Exception as e:
+            logger.error(f"Error scheduling appointment: {e}")
+            return "I didn't quite catch that date and time. Could you repeat it?"
+
+    async def handle_availability_request(self, extracted_info: dict) -> str:
+        try:
+            now = datetime.now(_TZ)
+            if extracted_info["dates"]:
+                date_str = extracted_info["dates"][0]
+                keyword_fn = _DATE_KEYWORDS.get(date_str.lower())
+                if keyword_fn is not None:
+                    check_date = datetime.combine(keyword_fn(), datetime.min.time())
+                else:
+                    check_date = await asyncio.to_thread(_cached_parse, date_str)
+            else:
+                check_date = now + timedelta(days=1)
+
+            slots = await asyncio.to_thread(
+                self.appointment_manager.get_first_available_slots, check_date
+            )
+            if not slots:
+                return (
+                    f"I'm sorry, we're fully booked on "
+                    f"{check_date.strftime('%A, %B %d')}. Would another day work?"
+                )
+            return self.format_available_slots(slots, check_date)
+        except Exception as e:
+            logger.error(f"Error checking availability: {e}")
+            return "Which day would you like me to check?"
+
+    def format_available_slots(self, slots, check_date) -> str:
+        # f-string datetime formatting beats strftime for short patterns,
+        # and the comprehension saves the append loop
+        formatted_slots = [f"{slot:%I:%M %p}" for slot in slots]
+        return (
+            f"On {check_date:%A, %B %d} we have openings at: "
+            + ", ".join(formatted_slots)
+        )
+
+    async def handle_cancel_request(self, extracted_info: dict) -> str:
+        if extracted_info["phone"]:
+            client = await asyncio.to_thread(
+                self.appointment_manager.get_client_by_phone, extracted_info["phone"]
+            )
+            if client:
+                appointments = await asyncio.to_thread(
+                    self.appointment_manager.get_appointments_for_client, client["id"]
+                )
+                upcoming = [a for a in appointments if a.status == "scheduled"]
+                if upcoming:
+                    await asyncio.to_thread(
+                        self.appointment_manager.cancel_appointment, upcoming[0].id
+                    )
+                    return "Your appointment has been cancelled. We hope to see you again soon!"
+            return "I couldn't find an appointment under that number."
+        return "Can I get the phone number the appointment was booked under?"
+
+    def handle_reschedule_request(self, extracted_info: dict) -> str:
+        return (
+            "I can help you reschedule. What's the phone number the appointment "
+            "was booked under, and what new day and time would you like?"
+        )
+
+    def _bind_context(self, conversation_id: str) -> None:
+        """Resolve this conversation's context once and publish it for the
+        handlers via the contextvar."""
+        ctx = self.conversation_context.get(conversation_id)
+        if ctx is None:
+            ctx = _SessionCtx()
+            self.conversation_context[conversation_id] = ctx
+        else:
+            self.conversation_context.move_to_end(conversation_id)
+        if len(self.conversation_context) > _MAX_ACTIVE_CONTEXTS:
+            self.conversation_context.popitem(last=False)
+        _APPT_CTX.set(ctx)
+
+    async def process_scheduling_request(self, message: str, conversation_id: str) -> str:
+        extracted_info = self.extract_appointment_intent(message)
+        intent = extracted_info["intent"]
+        self._bind_context(conversation_id)
+
+        if intent == "schedule":
+            return await self.handle_schedule_request(extracted_info, conversation_id)
+        elif intent == "reschedule":
+            return self.handle_reschedule_request(extracted_info)
+        elif intent == "cancel":
+            return await self.handle_cancel_request(extracted_info)
+        elif intent == "check_availability":
+            return await self.handle_availability_request(extracted_info)
+        else:
+            return (
+                "I can help you schedule, reschedule, or cancel personal training "
+                "appointments, or check availability. What would you like to do?"
+            )
+
+    async def respond(
+        self,
+        human_input,
+        conversation_id: str,
+        is_interrupt: bool = False,
+    ) -> Tuple[Optional[str], bool]:
+        response = await self.process_scheduling_request(human_input, conversation_id)
+        return response, False
+
+    def get_appointment_instructions(self) -> str:
+        return _APPT_INSTRUCTIONS
+
+
+class AppointmentAgentFactory(AgentFactory):
+    def create_agent(
+        self, agent_config: AgentConfig, logger: Optional[logging.Logger] = None
+    ) -> BaseAgent:
+        if agent_config.type == AgentType.CHAT_GPT:
+            chat_config = ChatGPTAgentConfig(
+                initial_message=_INITIAL_MSG,
+                prompt_preamble=_APPT_INSTRUCTIONS,
+                generate_responses=True,
+            )
+            return ChatGPTAgent(
+                agent_config=typing.cast(ChatGPTAgentConfig, chat_config)
+            )
+        elif agent_config.type == "agent_appointment_scheduling":
+            return AppointmentSchedulingAgent(
+                agent_config=typing.cast(AppointmentSchedulingAgentConfig, agent_config)
+            )
+        raise Exception("Invalid agent config")
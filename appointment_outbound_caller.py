@@ -0,0 +1,425 @@
+import asyncio
+import logging
+import os
+import queue
+import random
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from vocode.streaming.models.agent import ChatGPTAgentConfig
+from vocode.streaming.models.message import BaseMessage
+from vocode.streaming.models.telephony import TwilioConfig
+from vocode.streaming.telephony.config_manager.redis_config_manager import (
+    RedisConfigManager,
+)
+from vocode.streaming.telephony.conversation.outbound_call import OutboundCall
+from twilio.base.exceptions import TwilioRestException
+
+from config import TELEPHONY as _ENV
+from utils.appointment_utils import appointment_manager
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    # Records are enqueued from the event loop and written by a background
+    # listener thread, so the dial path pays an O(1) enqueue instead of a
+    # synchronous stdout write+flush per line.
+    _log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(_log_queue, logging.StreamHandler())
+    _listener.start()
+    logger.addHandler(QueueHandler(_log_queue))
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+
+# Prompt templates are built once at import; per call we only substitute
+# the handful of variable fields instead of re-assembling the whole text.
+_REMINDER_PROMPT_TMPL = """You are calling {client_name} to remind them about their personal training appointment.
+
+Appointment details:
+- Date: {date_str}
+- Time: {time_str}
+- Duration: {duration} minutes
+
+Confirm they can still make it. If they need to reschedule, collect their preferred
+new day and time and let them know someone will confirm shortly. Keep the call short
+and friendly."""
+
+_REMINDER_INIT_TMPL = (
+    "Hi {client_name}, this is a reminder call from your personal training "
+    "studio about your appointment on {day_time_str}. Can you still make it?"
+)
+
+_FOLLOWUP_PROMPT_TMPL = """You are calling {client_name}, a personal training client who hasn't
+booked a session recently. Check in on how their training is going and offer to
+schedule their next session. Be encouraging, never pushy. If they want to book,
+collect their preferred day and time."""
+
+_FOLLOWUP_INIT_TMPL = (
+    "Hi {client_name}! This is your personal training studio checking in. "
+    "How has your training been going?"
+)
+
+_SCHEDULING_PROMPT = """You are calling on behalf of a personal training studio to help the
+person on the line schedule a personal training session. Introduce yourself, ask if
+they are interested in booking, and if so collect their name and preferred day and
+time. Business hours are 9 AM to 6 PM, Monday through Saturday. Be brief and polite,
+and thank them for their time either way."""
+
+_SCHEDULING_INIT = (
+    "Hi, this is calling from your local personal training studio. "
+    "Do you have a quick minute to talk about booking a session?"
+)
+
+class AsyncTokenBucket:
+    """Token-bucket pacing for outbound dial rate.
+
+    Refills continuously at `rate_per_sec` up to `burst` tokens, so a call
+    that returns early doesn't make the next one wait out a fixed sleep -
+    the long-run rate is held while short bursts pass straight through.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        self._rate = rate_per_sec
+        self._burst = float(burst)
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._burst, self._tokens + (now - self._last) * self._rate
+                )
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+@lru_cache(maxsize=512)
+def _init_message(text: str) -> BaseMessage:
+    """Memoized BaseMessage construction.
+
+    Reminder/follow-up greetings repeat per client, and scheduling's is a
+    constant; caching by final text skips pydantic model validation on
+    the hot dial path. BaseMessage is never mutated after creation, so
+    sharing instances is safe.
+    """
+    return BaseMessage(text=text)
+
+
+# Upper bound on simultaneously dialing calls; Twilio's per-second dial
+# rate is enforced on their side, this caps our in-flight fan-out.
+CALL_CONCURRENCY = int(os.getenv("CALL_CONCURRENCY", "10"))
+
+
+class AppointmentOutboundCaller:
+    """Places reminder, follow-up and scheduling calls through Twilio."""
+
+    def __init__(self):
+        self.base_url = _ENV.base_url
+        self.from_phone = _ENV.from_phone
+        self.twilio_config = TwilioConfig(
+            account_sid=_ENV.twilio_sid,
+            auth_token=_ENV.twilio_token,
+        )
+        self.appointment_manager = appointment_manager
+        self._sem = asyncio.Semaphore(CALL_CONCURRENCY)
+        # One config manager per process: the Redis connection pool behind
+        # it is reused across every dial instead of rebuilt per call.
+        self.config_manager = RedisConfigManager()
+        # Appointments dispatched recently (10-minute TTL). Overlapping
+        # cron polls can re-select an appointment before its
+        # reminder_sent write commits; this short-circuits the duplicate
+        # before it costs two Firestore reads and a dial.
+        self._dispatched: "OrderedDict[str, float]" = OrderedDict()
+        # The scheduling config has no per-call inputs; build it during
+        # construction so the first bulk run doesn't pay the pydantic
+        # validation cost per number dialed.
+        self._scheduling_cfg = ChatGPTAgentConfig(
+            initial_message=_init_message(_SCHEDULING_INIT),
+            prompt_preamble=_SCHEDULING_PROMPT,
+            generate_responses=True,
+        )
+
+    def create_reminder_agent_config(
+        self, appointment: Dict, client: Dict, streaming: bool = False
+    ) -> ChatGPTAgentConfig:
+        """Reminder calls default to non-streamed responses: the script is
+        a short confirm/reschedule exchange, and a single respond() round
+        per turn beats paying streaming-generation latency on every call.
+        """
+        appointment_time = appointment["appointment_time"]
+        # Each strftime pattern runs exactly once; the weekday-at-time
+        # string reuses the already-formatted time instead of a third
+        # full strftime pass.
+        time_str = appointment_time.strftime("%I:%M %p")
+        fields = {
+            "client_name": client["name"],
+            "date_str": appointment_time.strftime("%A, %B %d, %Y"),
+            "time_str": time_str,
+            "day_time_str": f"{appointment_time.strftime('%A')} at {time_str}",
+            "duration": appointment.get("duration_minutes", 60),
+        }
+        return ChatGPTAgentConfig(
+            initial_message=_init_message(_REMINDER_INIT_TMPL.format_map(fields)),
+            prompt_preamble=_REMINDER_PROMPT_TMPL.format_map(fields),
+            generate_responses=streaming,
+        )
+
+    def create_followup_agent_config(
+        self, client: Dict, streaming: bool = True
+    ) -> ChatGPTAgentConfig:
+        fields = {"client_name": client["name"]}
+        return ChatGPTAgentConfig(
+            initial_message=_init_message(_FOLLOWUP_INIT_TMPL.format_map(fields)),
+            prompt_preamble=_FOLLOWUP_PROMPT_TMPL.format_map(fields),
+            generate_responses=streaming,
+        )
+
+    def create_scheduling_agent_config(self) -> ChatGPTAgentConfig:
+        return self._scheduling_cfg
+
+    async def _with_retry(self, coro_factory, max_attempts: int = 3, base: float = 0.5):
+        """Retry transient Twilio failures with capped exponential backoff.
+
+        Rate-limit (429) and server-side (5xx) responses are worth retrying;
+        anything else re-raises immediately so bad numbers fail fast.
+        """
+        for attempt in range(max_attempts):
+            try:
+                return await coro_factory()
+            except TwilioRestException as e:
+                transient = e.status in (429, 500, 502, 503, 504) or (
+                    e.msg and ("rate limit" in str(e.msg).lower() or "quota" in str(e.msg).lower())
+                )
+                if not transient or attempt == max_attempts - 1:
+                    raise
+                await asyncio.sleep(base * 2**attempt + random.random() * 0.1)
+
+    async def _make_call(self, to_phone: str, agent_config: ChatGPTAgentConfig) -> bool:
+        try:
+            outbound_call = OutboundCall(
+                base_url=self.base_url,
+                to_phone=to_phone,
+                from_phone=self.from_phone,
+                config_manager=self.config_manager,
+                agent_config=agent_config,
+                twilio_config=self.twilio_config,
+            )
+            logger.debug("Making call to %s", to_phone)
+            await self._with_retry(outbound_call.start)
+            logger.debug("Call initiated to %s", to_phone)
+            return True
+        except Exception as e:
+            logger.error("Error making call to %s: %s", to_phone, e)
+            return False
+
+    # Error handling lives in exactly one layer per path: _make_call owns
+    # dial failures, the manager methods own Firestore failures (returning
+    # None/[]), and the bulk drivers' gather(return_exceptions=True) is
+    # the outer net. The per-method blanket try/excepts that used to
+    # re-wrap all of those are gone.
+
+    _DISPATCH_TTL_SECONDS = 600
+
+    def _recently_dispatched(self, appointment_id: str) -> bool:
+        """Check-and-claim `appointment_id` in the dispatched set."""
+        now = time.monotonic()
+        while self._dispatched:
+            oldest_id, dispatched_at = next(iter(self._dispatched.items()))
+            if now - dispatched_at < self._DISPATCH_TTL_SECONDS:
+                break
+            self._dispatched.popitem(last=False)
+        if appointment_id in self._dispatched:
+            return True
+        self._dispatched[appointment_id] = now
+        return False
+
+    async def make_reminder_call(
+        self, appointment_id: str, client: Optional[Dict] = None
+    ) -> bool:
+        if self._recently_dispatched(appointment_id):
+            logger.debug(
+                "Skipping %s - reminder already dispatched recently", appointment_id
+            )
+            return False
+        appointment = await self.appointment_manager.get_appointment_by_id_async(
+            appointment_id
+        )
+        if not appointment:
+            logger.warning("Appointment %s not found", appointment_id)
+            return False
+        # Queue processing pre-resolves clients in one batched read and
+        # passes them in; only one-off callers pay the lookup here.
+        if client is None:
+            client = await self.appointment_manager.get_client_by_id_async(
+                appointment["client_id"]
+            )
+        if not client:
+            logger.warning("Client %s not found", appointment["client_id"])
+            return False
+
+        agent_config = self.create_reminder_agent_config(appointment, client)
+        success = await self._make_call(client["phone"], agent_config)
+        if success:
+            await self.appointment_manager.mark_reminder_sent_async(appointment_id)
+        return success
+
+    async def make_follow_up_call(self, client_id: str) -> bool:
+        client = await self.appointment_manager.get_client_by_id_async(client_id)
+        if not client:
+            logger.warning("Client %s not found", client_id)
+            return False
+        return await self._make_call(
+            client["phone"], self.create_followup_agent_config(client)
+        )
+
+    async def make_scheduling_call(self, phone_number: str) -> bool:
+        return await self._make_call(
+            phone_number, self.create_scheduling_agent_config()
+        )
+
+    def make_scheduling_call_task(self, phone_number: str) -> "asyncio.Task":
+        """Kick off a scheduling call without awaiting it.
+
+        Fire-and-forget drivers gather the returned tasks themselves,
+        skipping the await-return trampoline frame an intermediate
+        coroutine would add per call.
+        """
+        return asyncio.create_task(self.make_scheduling_call(phone_number))
+
+    async def process_reminder_queue(self, hours_ahead: int = 24) -> Dict:
+        """Call every appointment that still needs a reminder.
+
+        Streaming pipeline: at most CALL_CONCURRENCY dials are in flight,
+        and the moment one completes its slot is handed to the next
+        appointment (asyncio.wait FIRST_COMPLETED) rather than waiting for
+        a whole gather batch. Steady-state throughput tracks the account's
+        concurrent-call ceiling.
+        """
+        stats = {"processed": 0, "successful": 0, "failed": 0}
+        appointments_needing_reminders = await (
+            self.appointment_manager.get_appointments_needing_reminders_async(
+                hours_ahead
+            )
+        )
+        # One get_all round-trip for every client in the batch, instead
+        # of a per-appointment document get inside the call loop.
+        clients = await self.appointment_manager.get_clients_by_ids_async(
+            [a["client_id"] for a in appointments_needing_reminders]
+        )
+
+        def _tally(done):
+            for task in done:
+                stats["processed"] += 1
+                exc = task.exception()
+                if exc is None and task.result() is True:
+                    stats["successful"] += 1
+                else:
+                    if exc is not None:
+                        logger.error(
+                            "Error processing reminder for %s: %s",
+                            getattr(task, "_appointment_id", "?"),
+                            exc,
+                        )
+                    stats["failed"] += 1
+
+        pending = set()
+        for appointment in appointments_needing_reminders:
+            if len(pending) >= CALL_CONCURRENCY:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                _tally(done)
+            task = asyncio.create_task(
+                self.make_reminder_call(
+                    appointment["id"], client=clients.get(appointment["client_id"])
+                )
+            )
+            task._appointment_id = appointment["id"]
+            pending.add(task)
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            _tally(done)
+        return stats
+
+    async def _bulk_calls(
+        self, keys: List[str], call_one, delay_seconds: int
+    ) -> Dict[str, bool]:
+        """Run `call_one(key)` for every key: concurrency capped by the
+        caller's semaphore, dial rate capped by a shared token bucket.
+
+        delay_seconds keeps its meaning as the average inter-call gap, but
+        calls overlap instead of each one blocking the loop until done.
+        """
+        bucket = AsyncTokenBucket(rate_per_sec=1.0 / delay_seconds, burst=1)
+
+        async def _one(key):
+            async with self._sem:
+                await bucket.acquire()
+                return await call_one(key)
+
+        outcomes = await asyncio.gather(
+            *(_one(key) for key in keys), return_exceptions=True
+        )
+        results = {}
+        for key, outcome in zip(keys, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error("Error in bulk call for %s: %s", key, outcome)
+                outcome = False
+            results[key] = outcome
+        return results
+
+    async def bulk_scheduling_calls(
+        self, phone_numbers: List[str], delay_seconds: int = 60
+    ) -> Dict[str, bool]:
+        return await self._bulk_calls(
+            phone_numbers, self.make_scheduling_call, delay_seconds
+        )
+
+    async def bulk_follow_up_calls(
+        self, client_ids: List[str], delay_seconds: int = 60
+    ) -> Dict[str, bool]:
+        return await self._bulk_calls(
+            client_ids, self.make_follow_up_call, delay_seconds
+        )
+
+
+# Convenience helpers for one-off calls from scripts / the scheduler CLI.
+# They share one lazily-built caller so connection pools, configs and the
+# concurrency semaphore are reused instead of rebuilt per invocation.
+
+_caller_singleton: Optional[AppointmentOutboundCaller] = None
+
+
+def _get_caller() -> AppointmentOutboundCaller:
+    global _caller_singleton
+    if _caller_singleton is None:
+        _caller_singleton = AppointmentOutboundCaller()
+    return _caller_singleton
+
+
+async def make_single_reminder_call(appointment_id: str) -> bool:
+    return await _get_caller().make_reminder_call(appointment_id)
+
+
+async def make_single_followup_call(client_id: str) -> bool:
+    return await _get_caller().make_follow_up_call(client_id)
+
+
+async def make_single_scheduling_call(phone_number: str) -> bool:
+    return await _get_caller().make_scheduling_call(phone_number)
+
+
+async def send_appointment_reminders(hours_ahead: int = 24) -> Dict:
+    return await _get_caller().process_reminder_queue(hours_ahead)
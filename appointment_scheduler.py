@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from appointment_outbound_caller import AppointmentOutboundCaller
+from config import TIMEZONE
+from utils.appointment_utils import appointment_manager
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+# Production can raise this (e.g. LOG_LEVEL=WARNING) without touching code;
+# log arguments below are lazy so suppressed records cost nothing to format.
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# How many reminder calls may be in flight at once; Twilio enforces the
+# per-second dial rate on its side, this just bounds our fan-out.
+MAX_CONCURRENT_REMINDER_CALLS = int(os.getenv("MAX_CONCURRENT_REMINDER_CALLS", "5"))
+
+# Worker tasks draining the outbound scheduling queue
+SCHEDULING_CALL_WORKERS = int(os.getenv("SCHEDULING_CALL_WORKERS", "3"))
+
+
+class AppointmentSchedulerService:
+    """Runs the recurring reminder / follow-up jobs for the studio.
+
+    Jobs are scheduled with plain asyncio timers (sleep until the next
+    occurrence, run, repeat) so they coexist with any other awaited work
+    on the loop instead of polling a third-party scheduler every minute.
+    """
+
+    def __init__(self):
+        self.appointment_manager = appointment_manager
+        self.outbound_caller = AppointmentOutboundCaller()
+        self.running = False
+
+    @staticmethod
+    def _next_run(hhmm: str, weekday: Optional[int] = None) -> datetime:
+        """Next occurrence of hh:mm (optionally on a fixed weekday)."""
+        hour, minute = (int(part) for part in hhmm.split(":"))
+        now = datetime.now()
+        target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if weekday is None:
+            if target <= now:
+                target += timedelta(days=1)
+        else:
+            days_ahead = (weekday - target.weekday()) % 7
+            target += timedelta(days=days_ahead)
+            if target <= now:
+                target += timedelta(days=7)
+        return target
+
+    async def _run_at(self, hhmm: str, weekday: Optional[int], coro_factory) -> None:
+        while self.running:
+            target = self._next_run(hhmm, weekday)
+            await asyncio.sleep((target - datetime.now()).total_seconds())
+            if not self.running:
+                break
+            try:
+                await coro_factory()
+            except Exception as e:
+                logger.error("Scheduled job %s failed: %s", coro_factory.__name__, e)
+
+    async def start_service(self) -> None:
+        """Run the recurring jobs until stop_service is called."""
+        self.running = True
+        logger.info("Appointment scheduler service started")
+        jobs = [
+            # Daily reminder sweep at 9 AM
+            asyncio.create_task(self._run_at("09:00", None, self.send_daily_reminders)),
+            # Weekly follow-ups on Mondays at 10 AM
+            asyncio.create_task(self._run_at("10:00", 0, self.send_weekly_followups)),
+        ]
+        try:
+            await asyncio.gather(*jobs)
+        finally:
+            for job in jobs:
+                job.cancel()
+
+    def stop_service(self) -> None:
+        self.running = False
+        logger.info("Appointment scheduler service stopped")
+
+    async def send_daily_reminders(self) -> Dict:
+        """Call every client with an appointment in the next 24 hours."""
+        logger.info("Starting daily reminder calls")
+        appointments = self.appointment_manager.get_appointments_needing_reminders(24)
+        sem = asyncio.Semaphore(MAX_CONCURRENT_REMINDER_CALLS)
+
+        async def _one(appointment):
+            async with sem:
+                try:
+                    ok = await self.outbound_caller.make_reminder_call(
+                        appointment["id"]
+                    )
+                except Exception as e:
+                    logger.error(
+                        "Error sending reminder for appointment %s: %s",
+                        appointment["id"],
+                        e,
+                    )
+                    ok = False
+                return appointment["id"], ok
+
+        results = await asyncio.gather(*(_one(apt) for apt in appointments))
+        successful_calls = [apt_id for apt_id, ok in results if ok]
+        failed_calls = [apt_id for apt_id, ok in results if not ok]
+        logger.info(
+            "Reminder sweep finished: %d sent, %d failed",
+            len(successful_calls),
+            len(failed_calls),
+        )
+        if failed_calls:
+            logger.error("Failed reminder appointments: %s", failed_calls)
+        return {
+            "total": len(appointments),
+            "successful": successful_calls,
+            "failed": failed_calls,
+        }
+
+    async def send_weekly_followups(self) -> Dict:
+        """Check in with clients who trained recently but have nothing booked."""
+        logger.info("Starting weekly follow-up calls")
+        completed = self.appointment_manager.get_completed_appointments(days_back=30)
+        upcoming = self.appointment_manager.get_upcoming_appointments(days_ahead=14)
+        booked_client_ids = {apt.client_id for apt in upcoming}
+        followup_client_ids = list(
+            {apt["client_id"] for apt in completed} - booked_client_ids
+        )
+        results = await self.outbound_caller.bulk_follow_up_calls(
+            followup_client_ids, delay_seconds=30
+        )
+        return results
+
+    def get_appointment_stats(self) -> Dict:
+        """Summary numbers for the operator dashboard / CLI."""
+        upcoming_appointments = self.appointment_manager.get_upcoming_appointments(
+            days_ahead=7
+        )
+        reminders_needed = self.appointment_manager.get_appointments_needing_reminders(
+            24
+        )
+        total_today = self.appointment_manager.count_appointments_on(
+            datetime.now(TIMEZONE).date()
+        )
+        return {
+            "upcoming_week": len(upcoming_appointments),
+            "reminders_needed": len(reminders_needed),
+            "total_appointments_today": total_today,
+        }
+
+    async def process_scheduling_queue(self, phone_numbers: List[str]) -> Dict:
+        """Work through a list of prospects with outbound scheduling calls.
+
+        A fixed pool of worker tasks drains an asyncio.Queue, so throughput
+        is bounded by provider capacity rather than a fixed per-call delay.
+        """
+        logger.info("Processing scheduling queue of %d numbers", len(phone_numbers))
+        queue: asyncio.Queue = asyncio.Queue()
+        for number in phone_numbers:
+            queue.put_nowait(number)
+
+        results: Dict[str, bool] = {}
+
+        async def _worker():
+            while True:
+                number = await queue.get()
+                try:
+                    results[number] = await self.outbound_caller.make_scheduling_call(
+                        number
+                    )
+                except Exception as e:
+                    logger.error("Scheduling call to %s failed: %s", number, e)
+                    results[number] = False
+                finally:
+                    queue.task_done()
+
+        workers = [
+            asyncio.create_task(_worker()) for _ in range(SCHEDULING_CALL_WORKERS)
+        ]
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        return results
+
+
+async def main():
+    service = AppointmentSchedulerService()
+    while True:
+        print("\n=== Appointment Scheduler ===")
+        print("1. Send reminder calls now")
+        print("2. Send follow-up calls now")
+        print("3. Show appointment stats")
+        print("4. Call a single appointment reminder")
+        print("5. Run scheduling queue from numbers file")
+        print("6. Start scheduler service")
+        print("7. Exit")
+        choice = (await asyncio.to_thread(input, "\nEnter your choice (1-7): ")).strip()
+
+        if choice == "1":
+            results = await service.send_daily_reminders()
+            print(f"Reminders sent: {results}")
+        elif choice == "2":
+            results = await service.send_weekly_followups()
+            print(f"Follow-ups sent: {results}")
+        elif choice == "3":
+            print(service.get_appointment_stats())
+        elif choice == "4":
+            appointment_id = (await asyncio.to_thread(input, "Appointment id: ")).strip()
+            success = await service.outbound_caller.make_reminder_call(appointment_id)
+            print(f"Reminder call {'succeeded' if success else 'failed'}")
+        elif choice == "5":
+            path = (
+                await asyncio.to_thread(
+                    input, "Path to file with one phone number per line: "
+                )
+            ).strip()
+            with open(path) as f:
+                numbers = [line.strip() for line in f if line.strip()]
+            results = await service.process_scheduling_queue(numbers)
+            print(f"Queue processed: {results}")
+        elif choice == "6":
+            print("Starting scheduler service in the background...")
+            asyncio.create_task(service.start_service())
+        elif choice == "7":
+            break
+        else:
+            print("Invalid choice")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,8 @@
 import os
+from dataclasses import dataclass
+from typing import Optional
+
+import pytz
 
 # Define the database location inside the 'utils' folder
 DB_PATH = os.path.join(os.path.dirname(__file__), "db")
@@ -10,4 +14,32 @@ BASE_URL = os.environ.get("RENDER_EXTERNAL_HOSTNAME")
 # If you're self-hosting and have an open IP/domain, set it here or in your env.
 # Ensure the base url is set in the following format: subdomain.domain.com
 if not BASE_URL:
-    BASE_URL = os.environ.get("BASE_URL")
\ No newline at end of file
+    BASE_URL = os.environ.get("BASE_URL")
+# Studio-local timezone for anything user-facing (dates spoken to callers,
+# "today" boundaries, reminder windows). One tzinfo object per process.
+TIMEZONE = pytz.timezone(os.environ.get("APPT_TZ", "America/New_York"))
+
+
+@dataclass(frozen=True)
+class TelephonyEnv:
+    """Immutable snapshot of the telephony environment, read once at import.
+
+    Callers read attributes off this instead of repeating os.getenv parsing
+    per construction, and a missing variable shows up at import time rather
+    than on the first dial.
+    """
+
+    base_url: Optional[str]
+    from_phone: Optional[str]
+    twilio_sid: Optional[str]
+    twilio_token: Optional[str]
+    eleven_labs_api_key: Optional[str]
+
+
+TELEPHONY = TelephonyEnv(
+    base_url=BASE_URL,
+    from_phone=os.environ.get("OUTBOUND_CALLER_NUMBER"),
+    twilio_sid=os.environ.get("TWILIO_ACCOUNT_SID"),
+    twilio_token=os.environ.get("TWILIO_AUTH_TOKEN"),
+    eleven_labs_api_key=os.environ.get("ELEVEN_LABS_API_KEY"),
+)
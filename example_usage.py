@@ -0,0 +1,66 @@
+"""Walkthrough of the Firebase-backed scheduling pieces.
+
+Run directly to seed a handful of demo clients/appointments and exercise
+the appointment agent's extraction logic without placing any calls.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from appointment_agent import AppointmentSchedulingAgent, AppointmentSchedulingAgentConfig
+from utils.appointment_utils import appointment_manager
+
+
+def example_firebase_operations():
+    """Seed demo data with batched writes, then run a few reads."""
+    print("=== Firebase operations ===")
+
+    demo_clients = [
+        {"name": "Alice Example", "phone": "555-101-0001"},
+        {"name": "Bob Example", "phone": "555-101-0002"},
+        {"name": "Carol Example", "phone": "555-101-0003"},
+    ]
+    client_ids = appointment_manager.create_clients_bulk(demo_clients)
+    print(f"Created {len(client_ids)} clients in one batch")
+
+    tomorrow = datetime.utcnow().replace(
+        hour=10, minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    demo_appointments = [
+        {"client_id": client_id, "appointment_time": tomorrow + timedelta(hours=i)}
+        for i, client_id in enumerate(client_ids)
+    ]
+    appointment_ids = appointment_manager.create_appointments_bulk(demo_appointments)
+    print(f"Created {len(appointment_ids)} appointments in one batch")
+
+    upcoming = appointment_manager.get_upcoming_appointments(days_ahead=7)
+    print(f"Upcoming appointments this week: {len(upcoming)}")
+
+    available_slots = appointment_manager.get_first_available_slots(tomorrow, 3)
+    print(f"First available slots tomorrow: {available_slots}")
+
+
+async def example_agent_configuration():
+    """Run the scheduling agent's extraction over sample utterances."""
+    print("\n=== Agent extraction ===")
+    agent = AppointmentSchedulingAgent(
+        agent_config=AppointmentSchedulingAgentConfig()
+    )
+    test_messages = [
+        "Hi, I'd like to schedule a session for tomorrow at 2pm",
+        "What times do you have available on Friday?",
+        "I need to cancel my appointment",
+        "This is John Smith, my number is 555-123-4567",
+    ]
+    for test_message in test_messages:
+        extracted = agent.extract_appointment_intent(test_message)
+        print(f"{test_message!r} -> {extracted}")
+
+
+if __name__ == "__main__":
+    example_firebase_operations()
+    asyncio.run(example_agent_configuration())
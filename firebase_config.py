@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+
+import firebase_admin
+import google.cloud.firestore
+from firebase_admin import credentials, firestore
+
+logger = logging.getLogger(__name__)
+
+# Channel options for the async Firestore client. Keepalive pings stop
+# NAT/load-balancer idle timeouts from silently dropping the HTTP/2
+# connection between call bursts, which would make the next RPC pay a
+# full TLS + channel re-establishment instead of riding the warm
+# multiplexed channel.
+_GRPC_CHANNEL_OPTIONS = (
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+)
+
+
+class FirebaseConfig:
+    """Holds the Firebase app + Firestore client for the whole process.
+
+    Initialization is lazy: importing this module costs nothing, and the
+    credential load + connection setup happen on the first get_db() call.
+    That keeps cold starts fast and is fork-safe under multi-worker
+    servers (each worker initializes in its own process).
+    """
+
+    def __init__(self):
+        self.app = None
+        self._db = None
+        self._async_db = None
+
+    def _initialize_firebase(self):
+        # Avoid double-initialization when modules import us more than once
+        if firebase_admin._apps:
+            self.app = firebase_admin.get_app()
+            self._db = firestore.client(self.app)
+            return
+
+        # Either point FIREBASE_SERVICE_ACCOUNT_PATH at the JSON key file or
+        # put the whole JSON blob into FIREBASE_SERVICE_ACCOUNT_JSON
+        service_account_path = os.environ.get("FIREBASE_SERVICE_ACCOUNT_PATH")
+        service_account_json = os.environ.get("FIREBASE_SERVICE_ACCOUNT_JSON")
+
+        if service_account_path and os.path.exists(service_account_path):
+            cred = credentials.Certificate(service_account_path)
+        elif service_account_json:
+            cred = credentials.Certificate(json.loads(service_account_json))
+        else:
+            # Fall back to application default credentials (e.g. on GCP)
+            cred = credentials.ApplicationDefault()
+
+        self.app = firebase_admin.initialize_app(cred)
+        self._db = firestore.client(self.app)
+        logger.info("Firebase initialized successfully")
+
+    def get_db(self):
+        if self._db is None:
+            self._initialize_firebase()
+        return self._db
+
+    def get_async_db(self):
+        """Native-async Firestore client (grpc.aio) sharing the app's
+        credentials - queries await real network I/O instead of hopping
+        through a thread pool."""
+        if self._async_db is None:
+            self.get_db()  # make sure the app + credentials exist
+            client = google.cloud.firestore.AsyncClient(
+                project=self.app.project_id,
+                credentials=self.app.credential.get_credential(),
+            )
+            self._apply_channel_options(client)
+            self._async_db = client
+        return self._async_db
+
+    @staticmethod
+    def _apply_channel_options(client) -> None:
+        """Give the async client a gRPC channel with explicit keepalive.
+
+        The public AsyncClient constructor exposes no channel-option
+        knob, so this pre-builds the gapic transport the same way the
+        library's lazy helper would, just with our options attached.
+        Best effort: if the internals change across library versions we
+        log and keep the default channel rather than fail.
+        """
+        try:
+            from google.cloud.firestore_v1.services.firestore.async_client import (
+                FirestoreAsyncClient,
+            )
+            from google.cloud.firestore_v1.services.firestore.transports.grpc_asyncio import (
+                FirestoreGrpcAsyncIOTransport,
+            )
+
+            channel = FirestoreGrpcAsyncIOTransport.create_channel(
+                client._target,
+                credentials=client._credentials,
+                options=list(_GRPC_CHANNEL_OPTIONS),
+            )
+            transport = FirestoreGrpcAsyncIOTransport(
+                host=client._target,
+                credentials=client._credentials,
+                channel=channel,
+            )
+            client._firestore_api_internal = FirestoreAsyncClient(
+                transport=transport
+            )
+        except Exception as e:
+            logger.debug("Keeping default Firestore channel options: %s", e)
+
+
+# Shared instance, import this from everywhere else
+firebase_config = FirebaseConfig()
@@ -1,118 +1,278 @@
+import asyncio
 import logging
 import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
 
-from config import BASE_URL
+from dotenv import load_dotenv
 
-from fastapi import FastAPI
-from vocode.streaming.models.telephony import TwilioConfig
+load_dotenv()
 
-# Import both if using ngrok
-# from pyngrok import ngrok
-# import sys
-from memory_config import config_manager
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from vocode.streaming.models.agent import ChatGPTAgentConfig
 from vocode.streaming.models.message import BaseMessage
+from vocode.streaming.models.synthesizer import ElevenLabsSynthesizerConfig
+from vocode.streaming.models.telephony import TwilioConfig
+from vocode.streaming.models.transcriber import DeepgramTranscriberConfig
 from vocode.streaming.telephony.server.base import (
-    TwilioInboundCallConfig,
     TelephonyServer,
+    TwilioInboundCallConfig,
 )
-from vocode.streaming.models.synthesizer import StreamElementsSynthesizerConfig # ,ElevenLabsSynthesizerConfig
 
-# Imports our custom actions
-from speller_agent import SpellerAgentFactory
-
-# Imports additional events like transcripts
+from config import BASE_URL
 from events_manager import EventsManager
+from memory_config import config_manager
+from session_agent import SessionAgentFactory
+from session_outbound_caller import session_outbound_caller
+from utils.session_utils import DEFAULT_TRAINER_ID, session_manager
 
-# if running from python, this will load the local .env
-# docker-compose will load the .env file by itself
-from dotenv import load_dotenv
-
-load_dotenv()
-
-app = FastAPI(docs_url=None)
-
-# Initialize logging
 logging.basicConfig()
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-
-# We store the state of the call in memory
-# You can customize the config within the memory_config.py
-CONFIG_MANAGER = config_manager  #RedisConfigManager()
-
-# Activate this if you want to support NGROK
-# if not BASE_URL:
-#     ngrok_auth = os.environ.get("NGROK_AUTH_TOKEN")
-#     if ngrok_auth is not None:
-#         ngrok.set_auth_token(ngrok_auth)
-#     port = sys.argv[sys.argv.index("--port") + 1] if "--port" in sys.argv else 3000
-# 
-#     # Open a ngrok tunnel to the dev server
-#     BASE_URL = ngrok.connect(port).public_url.replace("https://", "")
-#     logger.info('ngrok tunnel "{}" -> "http://127.0.0.1:{}"'.format(BASE_URL, port))
-# 
-
-# Only continue of the base URL was set within the environment variable. 
+logger.setLevel(logging.INFO)
+
 if not BASE_URL:
     raise ValueError("BASE_URL must be set in environment if not using pyngrok")
 
-
-# Now we need a Twilio account and number from which to make our call.
-# You can make an account here: https://www.twilio.com/docs/iam/access-tokens#step-2-api-key
-# Ensure your account is NOT in trial as otherwise it won't work
 TWILIO_CONFIG = TwilioConfig(
-  account_sid=os.environ.get("TWILIO_ACCOUNT_SID"),
-  auth_token=os.environ.get("TWILIO_AUTH_TOKEN"),
+    account_sid=os.environ.get("TWILIO_ACCOUNT_SID"),
+    auth_token=os.environ.get("TWILIO_AUTH_TOKEN"),
 )
 
-# Get the instructions for the assistant
-def get_assistant_instructions():
-
-  # Open the file and read its contents
-  with open('instructions.txt', 'r') as file:
-    return file.read()
-
-# Now, we'll configure our agent and its objective.
-# We'll use ChatGPT here, but you can import other models like
-# GPT4AllAgent and ChatAnthropicAgent.
-# Don't forget to set OPENAI_API_KEY!
-AGENT_CONFIG = ChatGPTAgentConfig(
-  initial_message=BaseMessage(text="Hello, who am I talking to?"),
-  prompt_preamble=get_assistant_instructions(),
-  generate_responses=True,
+
+async def _fs(fn, *args):
+    """Run a blocking Firestore call off the event loop thread."""
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+class SingleFlight:
+    """Coalesce concurrent identical async calls into one inflight task.
+
+    N callers asking for the same key while a fetch is in the air all await
+    the same future, so a thundering herd costs one Firestore RPC.
+    """
+
+    def __init__(self):
+        self._inflight: dict = {}
+
+    async def do(self, key, coro_fn):
+        fut = self._inflight.get(key)
+        if fut is not None:
+            return await fut
+        fut = asyncio.ensure_future(coro_fn())
+        self._inflight[key] = fut
+        try:
+            return await fut
+        finally:
+            self._inflight.pop(key, None)
+
+
+_flight = SingleFlight()
+
+
+async def _get_default_trainer():
+    """Shared, deduplicated fetch of the default trainer document."""
+    return await _flight.do(
+        ("trainer", DEFAULT_TRAINER_ID),
+        lambda: _fs(session_manager.get_trainer_by_id, DEFAULT_TRAINER_ID),
+    )
+
+
+# Dashboard/cron polling hits the session list endpoints far more often than
+# the data changes. Responses are memoized for a short TTL; cold hits for
+# the same key are deduplicated through the single-flight layer above.
+# Bounded LRU: keys include caller-supplied query parameters, so without a
+# cap a client varying days_ahead/hours_ahead could grow the dict forever.
+_CACHE_TTL_SECONDS = 30
+_CACHE_MAX_ENTRIES = 64
+_response_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+async def _cached(key, fetch):
+    entry = _response_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        _response_cache.move_to_end(key)
+        return entry[1]
+    value = await _flight.do(key, fetch)
+    _response_cache[key] = (time.monotonic() + _CACHE_TTL_SECONDS, value)
+    _response_cache.move_to_end(key)
+    while len(_response_cache) > _CACHE_MAX_ENTRIES:
+        _response_cache.popitem(last=False)
+    return value
+
+
+# Liveness status shared with /health, maintained by the lifespan warmup so
+# load-balancer probes never touch Firestore themselves.
+_firestore_ok = False
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the trainer lookup in the background so startup doesn't block
+    # on Firestore before the server can accept connections.
+    async def _warm():
+        global _firestore_ok
+        trainer = await _get_default_trainer()
+        _firestore_ok = trainer is not None
+        if trainer:
+            logger.info(f"Connected to Firestore, trainer: {trainer.get('name')}")
+        else:
+            logger.warning("Default trainer not found in Firestore")
+
+    warmup = asyncio.create_task(_warm())
+    session_manager.start_trainer_watch()
+    yield
+    session_manager.stop_trainer_watch()
+    warmup.cancel()
+
+
+# Built once at import; the same frozen message is shared by every call
+_SESSION_INITIAL = BaseMessage(
+    text="Thanks for calling! How can I help with your training sessions today?"
+)
+
+
+@lru_cache(maxsize=1)
+def create_agent_config() -> ChatGPTAgentConfig:
+    """Shared inbound-call agent config, constructed exactly once."""
+    from session_agent import _SESSION_INSTRUCTIONS
+
+    return ChatGPTAgentConfig(
+        initial_message=_SESSION_INITIAL,
+        prompt_preamble=_SESSION_INSTRUCTIONS,
+        generate_responses=True,
+    )
+
+
+# orjson serializes the session lists (nested dicts with datetimes) several
+# times faster than the stdlib encoder FastAPI defaults to
+app = FastAPI(
+    docs_url=None, lifespan=lifespan, default_response_class=ORJSONResponse
 )
 
-# Now we'll give our agent a voice and ears.
-# Our default speech to text engine is DeepGram, so you'll need to set
-# the env variable DEEPGRAM_API_KEY to your Deepgram API key.
-# https://deepgram.com/
 
-# We use StreamElements for speech synthesis here because it's fast and
-# free, but there are plenty of other options that are slower but
-# higher quality (like Eleven Labs below, needs key) available in
-# vocode.streaming.models.synthesizer.
-SYNTH_CONFIG = StreamElementsSynthesizerConfig.from_telephone_output_device()
-# SYNTH_CONFIG = ElevenLabsSynthesizerConfig.from_telephone_output_device(
-#   api_key=os.getenv("ELEVEN_LABS_API_KEY") or "<your EL token>")
+@app.get("/health")
+async def health_check():
+    # Cheap liveness answer off the cached flag - probes hit this every
+    # few seconds and must not cost a Firestore read each time
+    return {
+        "status": "ok" if _firestore_ok else "degraded",
+        "firestore": _firestore_ok,
+    }
+
 
+@app.get("/health/deep")
+async def deep_health_check():
+    """Live Firestore probe for operators; refreshes the cached flag."""
+    global _firestore_ok
+    trainer = await _get_default_trainer()
+    _firestore_ok = trainer is not None
+    return {
+        "status": "ok" if trainer else "degraded",
+        "firestore": trainer is not None,
+        "trainer": trainer.get("name") if trainer else None,
+    }
+
+
+@app.get("/sessions/upcoming")
+async def get_upcoming_sessions(response: Response, days_ahead: int = 7):
+    async def fetch():
+        # Independent reads, fired concurrently
+        trainer, sessions = await asyncio.gather(
+            _get_default_trainer(),
+            session_manager.get_upcoming_sessions_async(
+                DEFAULT_TRAINER_ID, days_ahead
+            ),
+        )
+        return {
+            "trainer": trainer.get("name") if trainer else None,
+            "count": len(sessions),
+            "sessions": sessions,
+        }
+
+    response.headers["Cache-Control"] = f"max-age={_CACHE_TTL_SECONDS}"
+    return await _cached(("upcoming", DEFAULT_TRAINER_ID, days_ahead), fetch)
+
+
+@app.get("/sessions/reminders")
+async def get_sessions_needing_reminders(response: Response, hours_ahead: int = 24):
+    async def fetch():
+        sessions = await session_manager.get_sessions_needing_reminders_async(
+            hours_ahead
+        )
+        return {"count": len(sessions), "sessions": sessions}
+
+    response.headers["Cache-Control"] = f"max-age={_CACHE_TTL_SECONDS}"
+    return await _cached(("reminders", hours_ahead), fetch)
+
+
+@app.post("/cache/invalidate")
+async def invalidate_response_cache():
+    """Punch the endpoint cache after out-of-band writes."""
+    _response_cache.clear()
+    return {"invalidated": True}
+
+
+@app.post("/sessions/send-reminders")
+async def send_session_reminders(hours_ahead: int = 24):
+    stats = await session_outbound_caller.process_reminder_queue(hours_ahead)
+    # Reminder flags just changed; don't serve stale reminder lists
+    _response_cache.clear()
+    return stats
+
+
+@app.get("/clients/{client_id}/sessions")
+async def get_client_sessions(client_id: str):
+    client, sessions = await asyncio.gather(
+        _fs(session_manager.get_client_by_id, client_id),
+        session_manager.get_sessions_for_client_async(client_id),
+    )
+    if not client:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return {"client": client, "sessions": sessions}
 
 
-# This is where we spin up the Telephony server to get the calls running
 telephony_server = TelephonyServer(
     base_url=BASE_URL,
     config_manager=config_manager,
     inbound_call_configs=[
         TwilioInboundCallConfig(
             url="/inbound_call",
-            agent_config=AGENT_CONFIG,
-            twilio_config=TWILIO_CONFIG, 
-            synthesizer_config=SYNTH_CONFIG,           
+            agent_config=create_agent_config(),
+            twilio_config=TWILIO_CONFIG,
+            transcriber_config=DeepgramTranscriberConfig.from_telephone_input_device(
+                model="nova-2", language="en-US"
+            ),
+            synthesizer_config=ElevenLabsSynthesizerConfig.from_telephone_output_device(
+                api_key=os.getenv("ELEVEN_LABS_API_KEY"),
+                voice_id="21m00Tcm4TlvDq8ikWAM",
+            ),
         )
     ],
     events_manager=EventsManager(),
-    agent_factory=SpellerAgentFactory(),
+    agent_factory=SessionAgentFactory(),
     logger=logger,
 )
 
 app.include_router(telephony_server.get_router())
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Reload (and its file watcher) only in development; production runs
+    # uvloop + httptools across as many workers as WORKERS asks for.
+    # Firebase init is lazy (first get_db() call), so each forked worker
+    # builds its own client instead of inheriting one from the parent.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "3000")),
+        reload=os.getenv("DEV") == "1",
+        workers=int(os.getenv("WORKERS", "1")),
+        loop="uvloop",
+        http="httptools",
+        log_level="info",
+    )
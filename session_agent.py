@@ -0,0 +1,461 @@
+import asyncio
+import logging
+import re
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from dateutil import parser
+
+from vocode.streaming.agent.base_agent import RespondAgent
+from vocode.streaming.models.agent import AgentConfig, AgentType, ChatGPTAgentConfig
+from vocode.streaming.models.message import BaseMessage
+
+from utils.session_utils import DEFAULT_TRAINER_ID, session_manager
+
+logger = logging.getLogger(__name__)
+
+# Extraction patterns compiled once at import; extract_session_intent runs
+# on every user turn, so per-call re.compile churn is pure overhead.
+_DATE_PATTERNS = [
+    re.compile(r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b", re.I),
+    re.compile(r"\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b"),
+    re.compile(r"\b(today|tomorrow|next week)\b", re.I),
+]
+_TIME_PATTERNS = [
+    re.compile(r"\b(\d{1,2}:\d{2}\s*(?:am|pm)?)\b", re.I),
+    re.compile(r"\b(\d{1,2}\s*(?:am|pm))\b", re.I),
+    re.compile(r"\b(morning|afternoon|evening|noon)\b", re.I),
+]
+_PHONE_RE = re.compile(r"\b(\d{3}[-.]?\d{3}[-.]?\d{4})\b")
+# One alternation scans the message once for all intent keywords; group
+# order encodes priority (reschedule beats schedule, etc.) since the
+# regex engine takes the first alternative that matches at a position.
+_INTENT_RE = re.compile(
+    r"(?P<reschedule>\breschedul|\bchange\b|\bmove\b)"
+    r"|(?P<cancel>\bcancel|\bremove\b)"
+    r"|(?P<check_availability>\bavailab|\bfree\b|\bopen\b)"
+    r"|(?P<check_remaining>\bremaining\b|sessions left|how many)"
+    r"|(?P<schedule>\bschedul|\bbook\b|\bsession\b|\btraining\b)",
+    re.I,
+)
+_INTENT_GROUPS = {
+    name: rank
+    for rank, name in enumerate(
+        ("reschedule", "cancel", "check_availability", "check_remaining", "schedule")
+    )
+}
+# Markers for every higher-priority intent; the schedule fastpath below
+# may only fire when none of these could out-rank it.
+_NON_SCHEDULE_MARKERS = (
+    "reschedul",
+    "cancel",
+    "change",
+    "move",
+    "remove",
+    "availab",
+    "free",
+    "open",
+    "remaining",
+    "left",
+    "how many",
+)
+
+# dateutil's parser is flexible but slow; the extraction regexes only ever
+# hand us a handful of shapes, so try format-specific strptime first and
+# keep dateutil as the fallback for anything unusual.
+_ONE_DAY = timedelta(days=1)
+
+# Abandoned calls never clear their context; cap the table so a
+# long-running process can't leak one dict per conversation forever.
+_MAX_ACTIVE_CONTEXTS = 10000
+_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%m-%d-%Y", "%m-%d-%y")
+_TIME_FORMATS = ("%I:%M %p", "%I %p", "%I%p", "%H:%M")
+_WEEKDAYS = {
+    "monday": 0,
+    "tuesday": 1,
+    "wednesday": 2,
+    "thursday": 3,
+    "friday": 4,
+    "saturday": 5,
+    "sunday": 6,
+}
+
+
+def _fast_parse_date(date_str: str):
+    """Resolve an extracted date mention to a date, strptime-first."""
+    today = datetime.now().date()
+    if date_str == "today":
+        return today
+    if date_str == "tomorrow":
+        return today + _ONE_DAY
+    weekday = _WEEKDAYS.get(date_str)
+    if weekday is not None:
+        return today + timedelta(days=(weekday - today.weekday()) % 7 or 7)
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            pass
+    return parser.parse(date_str).date()
+
+
+def _fast_parse_time(time_str: str):
+    """Resolve an extracted time mention to a time, strptime-first."""
+    normalized = time_str.strip().upper()
+    for fmt in _TIME_FORMATS:
+        try:
+            return datetime.strptime(normalized, fmt).time()
+        except ValueError:
+            pass
+    return parser.parse(time_str).time()
+# Booking needs these four facts; bit i of the missing-mask is field i,
+# and _QUESTIONS[i] is the prompt that asks for it (format_map pulls any
+# already-known fields like the caller's name into the wording).
+_REQUIRED_FIELDS = ("name", "phone", "date", "time")
+_QUESTIONS = (
+    "I'd be happy to schedule a session for you! What's your name?",
+    "Thanks {name}! What's your phone number?",
+    "What day would you like to come in?",
+    "What time works best for you on {date}?",
+)
+_NAME_PATTERNS = [
+    re.compile(r"my name is\s+([a-z]+(?:\s+[a-z]+)?)", re.I),
+    re.compile(r"this is\s+([a-z]+(?:\s+[a-z]+)?)", re.I),
+    re.compile(r"i'?m\s+([a-z]+(?:\s+[a-z]+)?)", re.I),
+]
+
+_SESSION_INSTRUCTIONS = """You are a friendly scheduling assistant for a personal training studio.
+
+You help clients:
+- Schedule new training sessions
+- Reschedule or cancel existing sessions
+- Check the trainer's availability
+- Look up how many prepaid sessions they have left
+
+Business hours are 9 AM to 6 PM, Monday through Saturday. Sessions are 60
+minutes by default. Always confirm the day and time back to the client before
+booking, and keep responses short - this is a phone call."""
+
+
+class SessionSchedulingAgentConfig(AgentConfig, type="agent_session_scheduling"):
+    """Configuration for the session scheduling agent."""
+
+
+class SessionSchedulingAgent(RespondAgent[SessionSchedulingAgentConfig]):
+    """Keyword-driven agent that books, moves and cancels training sessions."""
+
+    def __init__(self, agent_config: SessionSchedulingAgentConfig, **kwargs):
+        super().__init__(agent_config=agent_config, **kwargs)
+        self.session_manager = session_manager
+        # conversation_id -> partial booking details; insertion order is
+        # recency order, oldest evicted once _MAX_ACTIVE_CONTEXTS is hit
+        self.conversation_context = OrderedDict()
+        # Intent -> handler table, built once; dispatch is a single dict
+        # probe instead of a string-compare chain per turn. Every handler
+        # takes (extracted_info, conversation_id).
+        self._intent_handlers = {
+            "schedule": self.handle_schedule_request,
+            "reschedule": self.handle_reschedule_request,
+            "cancel": self.handle_cancel_request,
+            "check_availability": self.handle_availability_request,
+            "check_remaining": self.handle_remaining_sessions_request,
+        }
+
+    def extract_session_intent(self, message: str) -> dict:
+        """Pull intent plus any name/phone/date/time mentions out of a turn."""
+        # Highest-priority intent anywhere in the message wins; a single
+        # linear scan replaces five sequential keyword sweeps. search()
+        # stops at the first match position, so when two intents appear
+        # ("cancel ... session") we resolve priority across the whole
+        # message, not by position.
+        # Fastpath: most turns are plain booking requests. If a schedule
+        # keyword is present and nothing that could out-rank it appears,
+        # skip the regex scan entirely - a handful of C-level substring
+        # probes on a short message beat the finditer pass.
+        lowered = message.casefold()
+        if ("schedul" in lowered or "book" in lowered) and not any(
+            marker in lowered for marker in _NON_SCHEDULE_MARKERS
+        ):
+            intent = "schedule"
+        else:
+            intent = "general"
+            best = len(_INTENT_GROUPS)
+            for match in _INTENT_RE.finditer(message):
+                rank = _INTENT_GROUPS[match.lastgroup]
+                if rank < best:
+                    best = rank
+                    intent = match.lastgroup
+                    if rank == 0:
+                        break
+
+        extracted_dates = []
+        for pattern in _DATE_PATTERNS:
+            extracted_dates.extend(
+                match.lower() for match in pattern.findall(message)
+            )
+
+        extracted_times = []
+        for pattern in _TIME_PATTERNS:
+            extracted_times.extend(
+                match.lower() for match in pattern.findall(message)
+            )
+
+        phones = _PHONE_RE.findall(message)
+
+        name = None
+        for pattern in _NAME_PATTERNS:
+            match = pattern.search(message)
+            if match:
+                # The capture keeps the transcriber's casing; only fix it
+                # up when the transcript came through all-lowercase.
+                name = match.group(1).strip()
+                if name.islower():
+                    name = name.title()
+                break
+
+        return {
+            "intent": intent,
+            "name": name,
+            "phone": phones[0] if phones else None,
+            "dates": extracted_dates,
+            "times": extracted_times,
+        }
+
+    async def handle_schedule_request(
+        self, extracted_info: dict, conversation_id: str
+    ) -> str:
+        try:
+            context = self.conversation_context.setdefault(conversation_id, {})
+            self.conversation_context.move_to_end(conversation_id)
+            while len(self.conversation_context) > _MAX_ACTIVE_CONTEXTS:
+                self.conversation_context.popitem(last=False)
+
+            if extracted_info["name"]:
+                context["name"] = extracted_info["name"]
+            if extracted_info["phone"]:
+                context["phone"] = extracted_info["phone"]
+            if extracted_info["dates"]:
+                context["date"] = extracted_info["dates"][0]
+            if extracted_info["times"]:
+                context["time"] = extracted_info["times"][0]
+
+            missing = 0
+            for i, field in enumerate(_REQUIRED_FIELDS):
+                if field not in context:
+                    missing |= 1 << i
+            if missing:
+                # Ask for the lowest missing field; isolate it with the
+                # two's-complement trick instead of building a list and
+                # re-testing membership three times per turn.
+                return _QUESTIONS[(missing & -missing).bit_length() - 1].format_map(
+                    context
+                )
+
+            session_date = _fast_parse_date(context["date"])
+            session_time = _fast_parse_time(context["time"])
+            session_datetime = datetime.combine(session_date, session_time)
+
+            # Firestore calls run off the event loop so other turns keep
+            # flowing, and the client doc we already fetched carries
+            # sessionsRemaining - no second read of the same document.
+            client = await asyncio.to_thread(
+                self.session_manager.get_client_by_phone, context["phone"]
+            )
+            if not client:
+                client_id = await asyncio.to_thread(
+                    self.session_manager.create_client,
+                    context["name"],
+                    context["phone"],
+                )
+                remaining = 0
+            else:
+                client_id = client["id"]
+                remaining = client.get("sessionsRemaining", 0)
+            if not client_id:
+                return (
+                    "I'm sorry, I had trouble saving your details. "
+                    "Could you try again?"
+                )
+
+            # One batched commit creates the session and decrements the
+            # prepaid counter together instead of two sequential writes.
+            session_id = await asyncio.to_thread(
+                self.session_manager.create_session_and_decrement,
+                client_id,
+                session_datetime,
+                remaining - 1 if remaining > 0 else None,
+            )
+            if session_id:
+                del self.conversation_context[conversation_id]
+                return (
+                    f"Perfect! I've scheduled your training session for "
+                    f"{session_datetime.strftime('%A, %B %d at %I:%M %p')}. "
+                    f"See you then, {context['name']}!"
+                )
+            return "I'm sorry, I couldn't book that session. Please try again."
+        except Exception as e:
+            logger.error(f"Error handling schedule request: {e}")
+            return (
+                "I'm sorry, something went wrong while booking. "
+                "Could you repeat that?"
+            )
+
+    async def handle_availability_request(
+        self, extracted_info: dict, conversation_id: str = ""
+    ) -> str:
+        try:
+            now = datetime.now()
+            if extracted_info["dates"]:
+                date_str = extracted_info["dates"][0]
+                if date_str == "today":
+                    check_date = now
+                elif date_str == "tomorrow":
+                    check_date = now + _ONE_DAY
+                else:
+                    check_date = datetime.combine(
+                        _fast_parse_date(date_str), datetime.min.time()
+                    )
+            else:
+                check_date = now + _ONE_DAY
+
+            slots = self.session_manager.get_available_slots(check_date)
+            if not slots:
+                return (
+                    f"I'm sorry, there are no openings on "
+                    f"{check_date.strftime('%A, %B %d')}. "
+                    f"Would another day work?"
+                )
+            slot_strings = [slot.strftime("%I:%M %p") for slot in slots[:5]]
+            return (
+                f"On {check_date.strftime('%A, %B %d')} we have these times "
+                f"available: {', '.join(slot_strings)}. Which works for you?"
+            )
+        except Exception as e:
+            logger.error(f"Error handling availability request: {e}")
+            return "I'm sorry, I couldn't check the schedule just now."
+
+    async def handle_cancel_request(
+        self, extracted_info: dict, conversation_id: str
+    ) -> str:
+        try:
+            phone = extracted_info["phone"]
+            if not phone:
+                return (
+                    "I can help you cancel. What's the phone number "
+                    "the session is booked under?"
+                )
+            client = self.session_manager.get_client_by_phone(phone)
+            if not client:
+                return "I couldn't find any sessions under that number."
+            sessions = self.session_manager.get_sessions_for_client(client["id"])
+            upcoming = [
+                s
+                for s in sessions
+                if s.get("status") == "scheduled"
+                and s["dateTime"].replace(tzinfo=None) > datetime.utcnow()
+            ]
+            if not upcoming:
+                return "I couldn't find an upcoming session to cancel."
+            session = upcoming[0]
+            if self.session_manager.cancel_session(session["id"]):
+                return (
+                    f"Done - I've cancelled your session on "
+                    f"{session['dateTime'].strftime('%A, %B %d at %I:%M %p')}."
+                )
+            return "I'm sorry, I couldn't cancel that session. Please try again."
+        except Exception as e:
+            logger.error(f"Error handling cancel request: {e}")
+            return "I'm sorry, something went wrong while cancelling."
+
+    async def handle_reschedule_request(
+        self, extracted_info: dict, conversation_id: str
+    ) -> str:
+        return (
+            "I can help you move your session. Let me cancel the old one and "
+            "book the new one - what day and time would you like instead?"
+        )
+
+    async def handle_remaining_sessions_request(
+        self, extracted_info: dict, conversation_id: str = ""
+    ) -> str:
+        try:
+            phone = extracted_info["phone"]
+            if not phone:
+                return (
+                    "I can look that up. What's the phone number on your account?"
+                )
+            client = self.session_manager.get_client_by_phone(phone)
+            if not client:
+                return "I couldn't find an account under that number."
+            remaining = client.get("sessionsRemaining", 0)
+            return f"You have {remaining} training sessions remaining."
+        except Exception as e:
+            logger.error(f"Error handling remaining sessions request: {e}")
+            return "I'm sorry, I couldn't look that up just now."
+
+    async def process_scheduling_request(
+        self, message: str, conversation_id: str
+    ) -> str:
+        extracted_info = self.extract_session_intent(message)
+        handler = self._intent_handlers.get(
+            extracted_info["intent"], self._handle_general_request
+        )
+        return await handler(extracted_info, conversation_id)
+
+    async def _handle_general_request(
+        self, extracted_info: dict, conversation_id: str
+    ) -> str:
+        return (
+            "I can help you schedule, reschedule or cancel training "
+            "sessions, check availability, or look up how many sessions "
+            "you have left. What would you like to do?"
+        )
+
+    def get_session_instructions(self) -> str:
+        return _SESSION_INSTRUCTIONS
+
+    async def respond(
+        self,
+        human_input: str,
+        conversation_id: str,
+        is_interrupt: bool = False,
+    ) -> Tuple[Optional[str], bool]:
+        response = await self.process_scheduling_request(human_input, conversation_id)
+        return response, False
+
+
+class SessionAgentFactory:
+    """Creates agents for inbound calls to the session line.
+
+    One factory instance is shared by the telephony server; the constant
+    ChatGPT config it hands out is built on first use and reused so each
+    new call only pays for the agent itself, not the config rebuild.
+    """
+
+    def __init__(self):
+        self._chat_gpt_config: Optional[ChatGPTAgentConfig] = None
+
+    def _get_chat_gpt_config(self) -> ChatGPTAgentConfig:
+        if self._chat_gpt_config is None:
+            self._chat_gpt_config = ChatGPTAgentConfig(
+                initial_message=BaseMessage(
+                    text="Thanks for calling! How can I help with your "
+                    "training sessions today?"
+                ),
+                prompt_preamble=_SESSION_INSTRUCTIONS,
+                generate_responses=True,
+            )
+        return self._chat_gpt_config
+
+    def create_agent(self, agent_config: AgentConfig, logger=None):
+        if agent_config.type == AgentType.CHAT_GPT.value:
+            from vocode.streaming.agent.chat_gpt_agent import ChatGPTAgent
+
+            return ChatGPTAgent(
+                agent_config=self._get_chat_gpt_config(),
+                logger=logger,
+            )
+        elif agent_config.type == "agent_session_scheduling":
+            return SessionSchedulingAgent(agent_config=agent_config)
+        raise Exception("Invalid agent config", agent_config.type)
@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import os
+import queue
+import random
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from vocode.streaming.models.agent import ChatGPTAgentConfig
+from vocode.streaming.models.message import BaseMessage
+from vocode.streaming.models.synthesizer import ElevenLabsSynthesizerConfig
+from vocode.streaming.models.telephony import TwilioConfig
+from vocode.streaming.models.transcriber import DeepgramTranscriberConfig
+from vocode.streaming.telephony.config_manager.redis_config_manager import (
+    RedisConfigManager,
+)
+from vocode.streaming.telephony.conversation.outbound_call import OutboundCall
+from twilio.base.exceptions import TwilioRestException
+
+from config import TELEPHONY as _ENV
+from utils.session_utils import session_manager
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    # Records are enqueued from the event loop and written by a background
+    # listener thread, so the dial path pays an O(1) enqueue instead of a
+    # synchronous stdout write+flush per line.
+    _log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(_log_queue, logging.StreamHandler())
+    _listener.start()
+    logger.addHandler(QueueHandler(_log_queue))
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+
+# (prompt template, initial-message template) per call type, assembled once
+# at import; create_session_agent_config only fills in the variable fields.
+_CALL_TEMPLATES = {
+    "reminder": (
+        """You are calling {client_name} to remind them about their
+personal training session on {date_str} at
+{time_str} ({duration} minutes).
+
+Confirm they can still make it. If they need to move it, collect their preferred
+new day and time and let them know their trainer will confirm. Keep it short and
+friendly.""",
+        "Hi {client_name}, this is a reminder from your training studio "
+        "about your session {day_time_str}. Can you still make it?",
+    ),
+    "followup": (
+        """You are calling {client_name}, a training client who hasn't
+booked recently. Check in on how their training is going and offer to schedule
+their next session. Be encouraging, never pushy.""",
+        "Hi {client_name}! This is your training studio checking in. "
+        "How has your training been going?",
+    ),
+    "scheduling": (
+        """You are calling on behalf of a personal training studio to help
+the person on the line book a training session. Collect their name and preferred
+day and time. Business hours are 9 AM to 6 PM, Monday through Saturday.""",
+        "Hi, this is your local personal training studio. Do you have a "
+        "quick minute to talk about booking a session?",
+    ),
+}
+
+@lru_cache(maxsize=512)
+def _init_message(text: str) -> BaseMessage:
+    """Memoized BaseMessage construction, keyed on the final text.
+
+    The greeting for a given client repeats across reminder runs; reusing
+    the immutable message skips pydantic validation per dial.
+    """
+    return BaseMessage(text=text)
+
+
+# How many reminder calls may be dialing at once; tune against Twilio's
+# rate limits without touching code.
+REMINDER_CONCURRENCY = int(os.getenv("REMINDER_CONCURRENCY", "10"))
+
+# Transcriber/synthesizer settings never vary between calls, so the
+# pydantic models are validated once at import and shared by every
+# caller instance rather than rebuilt per construction.
+_TRANSCRIBER_CFG = DeepgramTranscriberConfig.from_telephone_input_device(
+    model="nova-2", language="en-US"
+)
+_SYNTHESIZER_CFG = ElevenLabsSynthesizerConfig.from_telephone_output_device(
+    api_key=_ENV.eleven_labs_api_key,
+    voice_id="21m00Tcm4TlvDq8ikWAM",
+    stability=0.1,
+    similarity_boost=0.75,
+)
+
+
+class SessionOutboundCaller:
+    """Places reminder and check-in calls for training sessions."""
+
+    def __init__(self):
+        self.base_url = _ENV.base_url
+        self.from_phone = _ENV.from_phone
+        self.session_manager = session_manager
+        # Shared across every call this process places: the Redis config
+        # manager keeps one connection pool, and the Twilio/transcriber/
+        # synthesizer configs are immutable so there's no reason to pay
+        # construction (and connection setup) per dial.
+        self.config_manager = RedisConfigManager()
+        self.twilio_config = TwilioConfig(
+            account_sid=_ENV.twilio_sid,
+            auth_token=_ENV.twilio_token,
+        )
+        self.transcriber_config = _TRANSCRIBER_CFG
+        self.synthesizer_config = _SYNTHESIZER_CFG
+        # Scheduling calls have no per-call fields; the config is a
+        # constant, so build (and validate) it exactly once here.
+        self._scheduling_cfg = self.create_session_agent_config("scheduling")
+
+    def create_session_agent_config(
+        self,
+        call_type: str,
+        client: Optional[Dict] = None,
+        session: Optional[Dict] = None,
+        streaming: Optional[bool] = None,
+    ) -> ChatGPTAgentConfig:
+        # Reminders are short scripted confirmations, so they default to
+        # one-shot responses; open-ended call types keep streaming on.
+        if streaming is None:
+            streaming = call_type != "reminder"
+        if call_type not in _CALL_TEMPLATES:
+            call_type = "scheduling"
+        if call_type == "scheduling" and streaming:
+            cached = getattr(self, "_scheduling_cfg", None)
+            if cached is not None:
+                return cached
+        prompt_tmpl, init_tmpl = _CALL_TEMPLATES[call_type]
+        fields = {}
+        if client:
+            fields["client_name"] = client["name"]
+        if session:
+            session_time = session["dateTime"]
+            time_str = session_time.strftime("%I:%M %p")
+            fields["date_str"] = session_time.strftime("%A, %B %d, %Y")
+            fields["time_str"] = time_str
+            fields["day_time_str"] = f"{session_time.strftime('%A')} at {time_str}"
+            fields["duration"] = session.get("durationMinutes", 60)
+
+        return ChatGPTAgentConfig(
+            initial_message=_init_message(init_tmpl.format_map(fields)),
+            prompt_preamble=prompt_tmpl.format_map(fields),
+            generate_responses=streaming,
+        )
+
+    async def _with_retry(self, coro_factory, max_attempts: int = 3, base: float = 0.5):
+        """Retry transient Twilio failures with capped exponential backoff.
+
+        Rate-limit (429) and server-side (5xx) responses are worth retrying;
+        anything else re-raises immediately so bad numbers fail fast.
+        """
+        for attempt in range(max_attempts):
+            try:
+                return await coro_factory()
+            except TwilioRestException as e:
+                transient = e.status in (429, 500, 502, 503, 504) or (
+                    e.msg and ("rate limit" in str(e.msg).lower() or "quota" in str(e.msg).lower())
+                )
+                if not transient or attempt == max_attempts - 1:
+                    raise
+                await asyncio.sleep(base * 2**attempt + random.random() * 0.1)
+
+    async def _make_call(self, to_phone: str, agent_config: ChatGPTAgentConfig) -> bool:
+        try:
+            outbound_call = OutboundCall(
+                base_url=self.base_url,
+                to_phone=to_phone,
+                from_phone=self.from_phone,
+                config_manager=self.config_manager,
+                agent_config=agent_config,
+                twilio_config=self.twilio_config,
+                transcriber_config=self.transcriber_config,
+                synthesizer_config=self.synthesizer_config,
+            )
+            logger.debug("Making call to %s", to_phone)
+            await self._with_retry(outbound_call.start)
+            logger.debug("Call initiated to %s", to_phone)
+            return True
+        except Exception as e:
+            logger.error("Error making call to %s: %s", to_phone, e)
+            return False
+
+    async def make_reminder_call_from_doc(
+        self, session: Dict, client: Optional[Dict] = None, mark_sent: bool = True
+    ) -> bool:
+        """Place a reminder call for an already-fetched session document.
+
+        The reminder queue fetches full session docs in one query; looking
+        each one up again by id would double the Firestore reads per batch.
+        Pass `client` when the caller already hydrated it (the queue bulk-
+        fetches all clients up front) to skip the per-session lookup, and
+        `mark_sent=False` when the caller batch-marks successes itself.
+
+        Dial failures are handled in _make_call and anything else bubbles
+        to the queue's gather(return_exceptions=True); no blanket
+        try/except layer in between.
+        """
+        if client is None:
+            client = self.session_manager.get_client_by_id(session["clientId"])
+        if not client:
+            logger.warning("Client %s not found", session["clientId"])
+            return False
+
+        agent_config = self.create_session_agent_config(
+            "reminder", client=client, session=session
+        )
+        success = await self._make_call(client["phone"], agent_config)
+        if success and mark_sent:
+            self.session_manager.mark_reminder_sent(session["id"])
+        return success
+
+    async def make_reminder_call(self, session_id: str) -> bool:
+        """Fetch-then-call wrapper for external callers that only have an id."""
+        session = self.session_manager.get_session_by_id(session_id)
+        if not session:
+            logger.warning("Session %s not found", session_id)
+            return False
+        return await self.make_reminder_call_from_doc(session)
+
+    async def make_followup_call(self, client_id: str) -> bool:
+        client = self.session_manager.get_client_by_id(client_id)
+        if not client:
+            logger.warning("Client %s not found", client_id)
+            return False
+        return await self._make_call(
+            client["phone"], self.create_session_agent_config("followup", client=client)
+        )
+
+    async def process_reminder_queue(self, hours_ahead: int = 24) -> Dict:
+        """Call every session that still needs a reminder.
+
+        Calls are dialed concurrently under a semaphore instead of one at a
+        time with a fixed sleep, so a batch of N takes roughly
+        ceil(N / REMINDER_CONCURRENCY) call-setups rather than N.
+        """
+        stats = {"processed": 0, "successful": 0, "failed": 0}
+        sessions = self.session_manager.get_sessions_needing_reminders(hours_ahead)
+        # One get_all RPC hydrates every client in the batch up front
+        # instead of a point read per session inside the call loop.
+        clients = self.session_manager.get_clients_by_ids(
+            [session["clientId"] for session in sessions]
+        )
+        sem = asyncio.Semaphore(REMINDER_CONCURRENCY)
+
+        async def _one(session):
+            async with sem:
+                return await self.make_reminder_call_from_doc(
+                    session,
+                    client=clients.get(session["clientId"]),
+                    mark_sent=False,
+                )
+
+        results = await asyncio.gather(
+            *(_one(session) for session in sessions), return_exceptions=True
+        )
+        reminded = []
+        for session, result in zip(sessions, results):
+            stats["processed"] += 1
+            if result is True:
+                stats["successful"] += 1
+                reminded.append(session["id"])
+            else:
+                if isinstance(result, Exception):
+                    logger.error(
+                        "Error processing reminder for %s: %s",
+                        session["id"],
+                        result,
+                    )
+                stats["failed"] += 1
+        if reminded:
+            # One batched commit for the whole sweep instead of an update
+            # RPC inside every call task.
+            self.session_manager.mark_reminders_sent(reminded)
+        return stats
+
+
+# Shared caller instance used by the API
+session_outbound_caller = SessionOutboundCaller()
@@ -0,0 +1,119 @@
+"""Smoke checks for the session-scheduling stack.
+
+Run directly: `python test_session_system.py [env|firebase|manager|agent]`.
+With no argument every check runs in order.
+
+Imports are deliberately local to each check so that the cheap ones stay
+cheap: `env` verifies configuration without touching Firebase, and only
+the checks that actually need Firestore or the agent pay those imports
+(and the connection they trigger).
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def test_environment() -> bool:
+    """Verify required environment variables without importing Firebase."""
+    required = (
+        "TWILIO_ACCOUNT_SID",
+        "TWILIO_AUTH_TOKEN",
+        "OUTBOUND_CALLER_NUMBER",
+        "OPENAI_API_KEY",
+        "ELEVEN_LABS_API_KEY",
+        "DEEPGRAM_API_KEY",
+    )
+    missing = [name for name in required if not os.getenv(name)]
+    if missing:
+        print(f"Missing environment variables: {', '.join(missing)}")
+        return False
+    if not (os.getenv("BASE_URL") or os.getenv("RENDER_EXTERNAL_HOSTNAME")):
+        print("Missing BASE_URL (or RENDER_EXTERNAL_HOSTNAME)")
+        return False
+    print("Environment looks good")
+    return True
+
+
+def test_firebase_connection() -> bool:
+    """First Firestore round-trip; imports firebase lazily."""
+    from firebase_config import firebase_config
+
+    try:
+        db = firebase_config.get_db()
+        # Any cheap read proves credentials + connectivity
+        next(iter(db.collections()), None)
+        print("Firebase connection OK")
+        return True
+    except Exception as e:
+        print(f"Firebase connection failed: {e}")
+        return False
+
+
+def test_session_manager() -> bool:
+    """Exercise the read paths the voice agent depends on."""
+    from utils.session_utils import DEFAULT_TRAINER_ID, session_manager
+
+    try:
+        trainer = session_manager.get_trainer_by_id(DEFAULT_TRAINER_ID)
+        print(f"Default trainer: {trainer.get('name') if trainer else 'not found'}")
+        upcoming = session_manager.get_upcoming_sessions(DEFAULT_TRAINER_ID)
+        print(f"Upcoming sessions: {len(upcoming)}")
+        reminders = session_manager.get_sessions_needing_reminders()
+        print(f"Sessions needing reminders: {len(reminders)}")
+        return True
+    except Exception as e:
+        print(f"Session manager check failed: {e}")
+        return False
+
+
+def test_session_agent() -> bool:
+    """Run intent extraction over sample utterances; no calls placed."""
+    from session_agent import SessionSchedulingAgent, SessionSchedulingAgentConfig
+
+    agent = SessionSchedulingAgent(agent_config=SessionSchedulingAgentConfig())
+    samples = [
+        "I'd like to book a session tomorrow at 2pm",
+        "Can I reschedule my Friday session?",
+        "How many sessions do I have left?",
+        "This is Jane Doe, 555-123-4567",
+    ]
+    ok = True
+    for sample in samples:
+        extracted = agent.extract_session_intent(sample)
+        print(f"{sample!r} -> {extracted['intent']}")
+        ok = ok and isinstance(extracted, dict)
+    return ok
+
+
+CHECKS = {
+    "env": test_environment,
+    "firebase": test_firebase_connection,
+    "manager": test_session_manager,
+    "agent": test_session_agent,
+}
+
+
+def main() -> int:
+    names = sys.argv[1:] or list(CHECKS)
+    failed = []
+    for name in names:
+        check = CHECKS.get(name)
+        if check is None:
+            print(f"Unknown check: {name} (choose from {', '.join(CHECKS)})")
+            return 2
+        print(f"--- {name} ---")
+        if not check():
+            failed.append(name)
+    if failed:
+        print(f"FAILED: {', '.join(failed)}")
+        return 1
+    print("All checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Offline regression checks for the slot-availability math.
+
+Run directly: `python test_slot_availability.py [appointments|sessions]`.
+With no argument every check runs.
+
+These exercise the availability paths with the timezone mix they see in
+production - aware Firestore endpoints against both aware and naive
+requested dates - without touching Firestore: the busy-interval fetch is
+stubbed out on the manager instance, so a tz regression shows up here as
+a failed check instead of a silent "no openings" reply on a live call.
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+
+
+def test_appointment_sweep() -> bool:
+    """Sweep over a non-empty busy day, aware and naive request dates."""
+    from config import TIMEZONE as tz
+    from utils.appointment_utils import AppointmentManager
+
+    manager = AppointmentManager()
+    day = datetime.now(tz).date() + timedelta(days=1)
+    # One booking 10:00-11:00 studio time, shaped the way it round-trips
+    # through Firestore: the agent writes the naive wall time, the client
+    # labels it UTC and hands it back aware.  The 10:00 here is studio
+    # wall clock, not a real instant.
+    busy_wall = datetime.combine(day, datetime.min.time()) + timedelta(hours=10)
+    busy_start = busy_wall.replace(tzinfo=timezone.utc)
+    manager._busy_intervals = lambda date, trainer_id: [
+        (busy_start, busy_start + timedelta(hours=1))
+    ]
+
+    booked = tz.localize(busy_wall)
+    expected_free = 14  # 17 hour-long candidates minus 9:30, 10:00, 10:30
+    for label, date in (
+        ("aware", tz.localize(datetime.combine(day, datetime.min.time()))),
+        ("naive", datetime.combine(day, datetime.min.time())),
+    ):
+        slots = list(manager.iter_available_slots(date, duration_minutes=60))
+        if len(slots) != expected_free:
+            print(f"{label}: expected {expected_free} free slots, got {len(slots)}")
+            return False
+        if any(booked <= slot < booked + timedelta(hours=1) for slot in slots):
+            print(f"{label}: a slot overlaps the booked hour")
+            return False
+    print("Appointment sweep handles wall-time busy intervals")
+    return True
+
+
+def test_session_slot_paths() -> bool:
+    """Bitmask, sweep and (if NumPy is present) vector paths agree.
+
+    Busy endpoints are aware UTC - the shape Firestore returns - while
+    day_start is naive, the shape the session agent passes.
+    """
+    import random
+    from datetime import timezone
+
+    from utils.session_utils import SessionManager, _align_tz, np
+
+    def brute(day_start, day_end, busy, dur):
+        out, cur, step = [], day_start, timedelta(minutes=30)
+        length = timedelta(minutes=dur)
+        while cur + length <= day_end:
+            if not any(cur < e and cur + length > s for s, e in busy):
+                out.append(cur)
+            cur += step
+        return out
+
+    random.seed(17)
+    day_start = datetime(2026, 1, 5, 9)
+    day_end = datetime(2026, 1, 5, 18)
+    for trial in range(300):
+        busy_utc = []
+        for _ in range(random.randrange(0, 10)):
+            start = day_start + timedelta(minutes=30 * random.randrange(0, 18))
+            end = start + timedelta(minutes=30 * random.choice([1, 2, 3]))
+            busy_utc.append(
+                (start.replace(tzinfo=timezone.utc), end.replace(tzinfo=timezone.utc))
+            )
+        duration = random.choice([30, 60, 90])
+        busy_naive = [(s.replace(tzinfo=None), e.replace(tzinfo=None)) for s, e in busy_utc]
+        expected = brute(day_start, day_end, busy_naive, duration)
+
+        bitmask = SessionManager._available_slots_bitmask(day_start, busy_utc, duration)
+        if bitmask != expected:
+            print(f"trial {trial}: bitmask disagrees with brute force")
+            return False
+        aligned = [
+            (_align_tz(s, day_start), _align_tz(e, day_start)) for s, e in busy_utc
+        ]
+        sweep = SessionManager._available_slots_sweep(
+            day_start, day_end, aligned, duration
+        )
+        if sweep != expected:
+            print(f"trial {trial}: sweep disagrees with brute force")
+            return False
+        if np is not None and busy_utc:
+            vector = SessionManager._available_slots_np(
+                day_start, day_end, busy_utc, duration
+            )
+            if vector != expected:
+                print(f"trial {trial}: numpy path disagrees with brute force")
+                return False
+    print("Session slot paths agree on aware busy intervals")
+    return True
+
+
+CHECKS = {
+    "appointments": test_appointment_sweep,
+    "sessions": test_session_slot_paths,
+}
+
+
+def main() -> int:
+    names = sys.argv[1:] or list(CHECKS)
+    failed = []
+    for name in names:
+        check = CHECKS.get(name)
+        if check is None:
+            print(f"Unknown check: {name} (choose from {', '.join(CHECKS)})")
+            return 2
+        print(f"--- {name} ---")
+        if not check():
+            failed.append(name)
+    if failed:
+        print(f"FAILED: {', '.join(failed)}")
+        return 1
+    print("All checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Integer kernel for the free-slot sweep.
+
+The sweep reduces to pure integer arithmetic once busy intervals are
+expressed as seconds-from-midnight, which makes it a clean JIT target.
+Numba is strictly optional: when installed the kernel is compiled with
+``njit`` (and warmed at import so the first request doesn't pay the
+compile), otherwise the identical pure-Python function runs - still
+O(slots + busy), just interpreted.
+"""
+
+from typing import List, Sequence
+
+
+def _free_slot_offsets(
+    biz_start_s: int,
+    biz_end_s: int,
+    dur_s: int,
+    step_s: int,
+    busy_starts: Sequence[int],
+    busy_ends: Sequence[int],
+) -> List[int]:
+    """Free slot starts (seconds from midnight) on the business-hours grid.
+
+    `busy_starts`/`busy_ends` must be parallel arrays sorted by start.
+    """
+    out = []
+    busy_index = 0
+    busy_count = len(busy_starts)
+    current = biz_start_s
+    while current + dur_s <= biz_end_s:
+        while busy_index < busy_count and busy_ends[busy_index] <= current:
+            busy_index += 1
+        if not (busy_index < busy_count and busy_starts[busy_index] < current + dur_s):
+            out.append(current)
+        current += step_s
+    return out
+
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    free_slot_offsets = _free_slot_offsets
+    HAVE_NUMBA = False
+else:
+    free_slot_offsets = njit(cache=True)(_free_slot_offsets)
+    # Trigger compilation at import with the types the real calls use
+    free_slot_offsets(
+        32400, 64800, 3600, 1800, np.empty(0, np.int64), np.empty(0, np.int64)
+    )
+    HAVE_NUMBA = True
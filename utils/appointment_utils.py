@@ -0,0 +1,741 @@
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+from google.api_core import exceptions as gcloud_exceptions
+
+from config import TIMEZONE as _TZ
+from firebase_config import firebase_config
+from utils._slots_numba import HAVE_NUMBA, free_slot_offsets
+
+logger = logging.getLogger(__name__)
+
+# Firestore caps a WriteBatch at 500 operations
+_MAX_BATCH_OPS = 500
+
+# Client-by-phone lookups repeat on every turn of a conversation; cache
+# them briefly so one booking flow costs one Firestore read, not five.
+_CLIENT_CACHE_TTL_SECONDS = 300
+_CLIENT_CACHE_MAX_ENTRIES = 512
+
+# Business hours are fixed (9 AM - 6 PM, 30-minute grid), so the candidate
+# start times exist once as a static template; per-request work is just the
+# datetime.combine against the requested day, memoized per date below.
+_SLOT_START_TIMES = tuple(
+    (datetime.min + timedelta(hours=9, minutes=30 * i)).time() for i in range(18)
+)
+_DAY_OPEN_TIME = (datetime.min + timedelta(hours=9)).time()
+_DAY_CLOSE_TIME = (datetime.min + timedelta(hours=18)).time()
+
+
+@lru_cache(maxsize=32)
+def _candidate_starts(day):
+    """All potential slot starts on `day`, built once per recent date.
+
+    The grid is aware in the studio timezone: Firestore hands back aware
+    appointment_time values and the agent's "tomorrow" default is aware,
+    so a naive grid would raise on the first comparison. pytz needs
+    localize() rather than a tzinfo= argument to pick the right offset.
+    """
+    return tuple(
+        _TZ.localize(datetime.combine(day, t)) for t in _SLOT_START_TIMES
+    )
+
+
+def _grid_day(date: datetime):
+    """The calendar day the slot grid should cover for `date`."""
+    if date.tzinfo is not None:
+        return date.astimezone(_TZ).date()
+    return date.date()
+
+
+def _to_grid_tz(value: datetime) -> datetime:
+    """Make a busy-interval endpoint comparable with the aware grid.
+
+    The agent's write path stores naive studio wall times, which the
+    Firestore client labels UTC going in and hands back aware coming
+    out. The wall clock is the truth, so the bogus tag is stripped and
+    the value re-localized into the studio zone - converting with
+    astimezone would shift a 10 AM booking out of business hours and
+    mark the booked slot free.
+    """
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    return _TZ.localize(value)
+
+
+class Appointment:
+    """Compact appointment record returned by the list queries.
+
+    __slots__ keeps per-record footprint to six references instead of a
+    full dict per document - list endpoints can return hundreds of these
+    per scan, and downstream code only reads these fields.
+    """
+
+    __slots__ = (
+        "id",
+        "client_id",
+        "trainer_id",
+        "appointment_time",
+        "duration_minutes",
+        "status",
+    )
+
+    def __init__(
+        self, id, client_id, trainer_id, appointment_time, duration_minutes, status
+    ):
+        self.id = id
+        self.client_id = client_id
+        self.trainer_id = trainer_id
+        self.appointment_time = appointment_time
+        self.duration_minutes = duration_minutes
+        self.status = status
+
+    @classmethod
+    def from_doc(cls, doc) -> "Appointment":
+        data = doc.to_dict()
+        return cls(
+            id=doc.id,
+            client_id=data.get("client_id"),
+            trainer_id=data.get("trainer_id"),
+            appointment_time=data.get("appointment_time"),
+            duration_minutes=data.get("duration_minutes", 60),
+            status=data.get("status"),
+        )
+
+    def __repr__(self):
+        return (
+            f"Appointment(id={self.id!r}, client_id={self.client_id!r}, "
+            f"appointment_time={self.appointment_time!r}, status={self.status!r})"
+        )
+
+
+class AppointmentManager:
+    """Firestore-backed storage for clients and their appointments."""
+
+    def __init__(self):
+        self.clients_collection = "clients"
+        self.appointments_collection = "appointments"
+        # phone -> (expiry, client dict); insertion order doubles as LRU
+        self._client_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+    @property
+    def db(self):
+        # Resolved lazily so importing this module doesn't connect to
+        # Firestore; the client is created once on first use.
+        return firebase_config.get_db()
+
+    @property
+    def async_db(self):
+        # Async (grpc.aio) client for call paths that run on the event
+        # loop; same lazy, once-per-process construction as `db`.
+        return firebase_config.get_async_db()
+
+    # ------------------------------------------------------------------
+    # Clients
+    # ------------------------------------------------------------------
+
+    def _cached_client(self, phone: str) -> Optional[Dict]:
+        entry = self._client_cache.get(phone)
+        if entry is None:
+            return None
+        expiry, client = entry
+        if expiry < time.monotonic():
+            del self._client_cache[phone]
+            return None
+        self._client_cache.move_to_end(phone)
+        return client
+
+    def _remember_client(self, phone: str, client: Dict) -> None:
+        self._client_cache[phone] = (
+            time.monotonic() + _CLIENT_CACHE_TTL_SECONDS,
+            client,
+        )
+        self._client_cache.move_to_end(phone)
+        while len(self._client_cache) > _CLIENT_CACHE_MAX_ENTRIES:
+            self._client_cache.popitem(last=False)
+
+    def create_client(self, name: str, phone: str, email: str = "") -> Optional[str]:
+        try:
+            now = datetime.now(timezone.utc)
+            client_data = {
+                "name": name,
+                "phone": phone,
+                "email": email,
+                "created_at": now,
+                "updated_at": now,
+            }
+            doc_ref = self.db.collection(self.clients_collection).document()
+            doc_ref.set(client_data)
+            self._client_cache.pop(phone, None)
+            return doc_ref.id
+        except Exception as e:
+            logger.warning("Error creating client: %s", e)
+            return None
+
+    def upsert_client(self, name: str, phone: str) -> Optional[str]:
+        """Create-or-update a client keyed on phone with a single write.
+
+        Clients created here use the normalized phone number as the document
+        id, so get-or-create is one merge write instead of a query followed
+        by a conditional insert. Firestore has no INSERT..ON CONFLICT, this
+        is the closest equivalent.
+        """
+        try:
+            doc_id = "".join(filter(str.isdigit, phone)) or phone
+            doc_ref = self.db.collection(self.clients_collection).document(doc_id)
+            doc_ref.set(
+                {"name": name, "phone": phone, "updated_at": datetime.now(timezone.utc)},
+                merge=True,
+            )
+            self._client_cache.pop(phone, None)
+            return doc_ref.id
+        except Exception as e:
+            logger.warning("Error upserting client: %s", e)
+            return None
+
+    def create_clients_bulk(self, clients: List[Dict]) -> List[str]:
+        """Create many clients with batched writes (one RPC per 500 docs).
+
+        Each dict needs at least `name` and `phone`; timestamps are filled
+        in here. Returns the new document ids in input order.
+        """
+        now = datetime.now(timezone.utc)
+        docs = [
+            {"email": "", **client, "created_at": now, "updated_at": now}
+            for client in clients
+        ]
+        return self._bulk_create(self.clients_collection, docs)
+
+    def get_client_by_phone(self, phone: str) -> Optional[Dict]:
+        cached = self._cached_client(phone)
+        if cached is not None:
+            return cached
+        try:
+            query = (
+                self.db.collection(self.clients_collection)
+                .where("phone", "==", phone)
+                .limit(1)
+            )
+            docs = query.get()
+            for doc in docs:
+                client_data = doc.to_dict()
+                client_data["id"] = doc.id
+                self._remember_client(phone, client_data)
+                return client_data
+            return None
+        except Exception as e:
+            logger.warning("Error finding client by phone: %s", e)
+            return None
+
+    def get_client_by_id(self, client_id: str) -> Optional[Dict]:
+        try:
+            doc = self.db.collection(self.clients_collection).document(client_id).get()
+            if doc.exists:
+                client_data = doc.to_dict()
+                client_data["id"] = doc.id
+                return client_data
+            return None
+        except Exception as e:
+            logger.warning("Error getting client: %s", e)
+            return None
+
+    def get_clients_by_ids(self, client_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch many clients in one RPC via `get_all`.
+
+        Returns a dict keyed by document id; missing ids are simply absent.
+        One round-trip instead of len(client_ids) serial document gets.
+        """
+        result: Dict[str, Dict] = {}
+        if not client_ids:
+            return result
+        try:
+            refs = [
+                self.db.collection(self.clients_collection).document(client_id)
+                for client_id in dict.fromkeys(client_ids)
+            ]
+            for doc in self.db.get_all(refs):
+                if doc.exists:
+                    client_data = doc.to_dict()
+                    client_data["id"] = doc.id
+                    result[doc.id] = client_data
+            return result
+        except Exception as e:
+            logger.warning("Error getting clients in bulk: %s", e)
+            return result
+
+    # ------------------------------------------------------------------
+    # Appointments
+    # ------------------------------------------------------------------
+
+    def create_appointment(
+        self,
+        client_id: str,
+        appointment_time: datetime,
+        duration_minutes: int = 60,
+        trainer_id: str = "default",
+        notes: str = "",
+    ) -> Optional[str]:
+        try:
+            now = datetime.now(timezone.utc)
+            appointment_data = {
+                "client_id": client_id,
+                "trainer_id": trainer_id,
+                "appointment_time": appointment_time,
+                "duration_minutes": duration_minutes,
+                "status": "scheduled",
+                # Denormalized: True while status is scheduled/confirmed,
+                # maintained on every status write so the reminder query
+                # can filter on one boolean instead of an in-clause.
+                "active": True,
+                "notes": notes,
+                "reminder_sent": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+            doc_ref = self.db.collection(self.appointments_collection).document()
+            doc_ref.set(appointment_data)
+            return doc_ref.id
+        except Exception as e:
+            logger.warning("Error creating appointment: %s", e)
+            return None
+
+    def create_appointments_bulk(self, appointments: List[Dict]) -> List[str]:
+        """Create many appointments with batched writes.
+
+        Each dict needs `client_id` and `appointment_time`; the usual
+        defaults (status, duration, reminder flag, timestamps) are applied.
+        Returns the new document ids in input order.
+        """
+        now = datetime.now(timezone.utc)
+        docs = [
+            {
+                "trainer_id": "default",
+                "duration_minutes": 60,
+                "status": "scheduled",
+                "active": True,
+                "notes": "",
+                "reminder_sent": False,
+                **appointment,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for appointment in appointments
+        ]
+        return self._bulk_create(self.appointments_collection, docs)
+
+    def _bulk_create(self, collection: str, docs: List[Dict]) -> List[str]:
+        """Write `docs` in batches of 500, amortizing the RPC round-trip."""
+        ids: List[str] = []
+        try:
+            for start in range(0, len(docs), _MAX_BATCH_OPS):
+                batch = self.db.batch()
+                batch_ids = []
+                for doc in docs[start : start + _MAX_BATCH_OPS]:
+                    doc_ref = self.db.collection(collection).document()
+                    batch.set(doc_ref, doc)
+                    batch_ids.append(doc_ref.id)
+                self._commit_with_retry(batch)
+                ids.extend(batch_ids)
+            return ids
+        except Exception as e:
+            logger.warning("Error bulk creating %s: %s", collection, e)
+            return ids
+
+    @staticmethod
+    def _commit_with_retry(batch, attempts: int = 5) -> None:
+        """Commit a batch, retrying contended commits with backoff."""
+        delay = 0.5
+        for attempt in range(attempts):
+            try:
+                batch.commit()
+                return
+            except gcloud_exceptions.Aborted:
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(delay)
+                delay *= 2
+
+    def get_appointment_by_id(self, appointment_id: str) -> Optional[Dict]:
+        try:
+            doc = (
+                self.db.collection(self.appointments_collection)
+                .document(appointment_id)
+                .get()
+            )
+            if doc.exists:
+                appointment_data = doc.to_dict()
+                appointment_data["id"] = doc.id
+                return appointment_data
+            return None
+        except Exception as e:
+            logger.warning("Error getting appointment: %s", e)
+            return None
+
+    def get_appointments_for_client(self, client_id: str) -> List[Appointment]:
+        try:
+            query = (
+                self.db.collection(self.appointments_collection)
+                .where("client_id", "==", client_id)
+                .order_by("appointment_time")
+            )
+            return [Appointment.from_doc(doc) for doc in query.stream()]
+        except Exception as e:
+            logger.warning("Error getting appointments for client: %s", e)
+            return []
+
+    def get_upcoming_appointments(self, days_ahead: int = 7) -> List[Appointment]:
+        try:
+            now = datetime.now(timezone.utc)
+            end = now + timedelta(days=days_ahead)
+            query = (
+                self.db.collection(self.appointments_collection)
+                .where("appointment_time", ">=", now)
+                .where("appointment_time", "<=", end)
+                .order_by("appointment_time")
+            )
+            return [Appointment.from_doc(doc) for doc in query.stream()]
+        except Exception as e:
+            logger.warning("Error getting upcoming appointments: %s", e)
+            return []
+
+    def count_appointments_on(self, date) -> int:
+        """Server-side count of appointments on a calendar day.
+
+        Uses the Firestore count() aggregation so only an integer crosses
+        the wire instead of a day's worth of documents.
+        """
+        try:
+            day_start = datetime.combine(date, datetime.min.time())
+            day_end = day_start + timedelta(days=1)
+            query = (
+                self.db.collection(self.appointments_collection)
+                .where("appointment_time", ">=", day_start)
+                .where("appointment_time", "<", day_end)
+            )
+            result = query.count().get()
+            return int(result[0][0].value)
+        except Exception as e:
+            logger.warning("Error counting appointments: %s", e)
+            return 0
+
+    def get_completed_appointments(self, days_back: int = 30) -> List[Dict]:
+        try:
+            now = datetime.now(timezone.utc)
+            start = now - timedelta(days=days_back)
+            query = (
+                self.db.collection(self.appointments_collection)
+                .where("status", "==", "completed")
+                .where("appointment_time", ">=", start)
+                .where("appointment_time", "<=", now)
+            )
+            return [{**doc.to_dict(), "id": doc.id} for doc in query.stream()]
+        except Exception as e:
+            logger.warning("Error getting completed appointments: %s", e)
+            return []
+
+    def get_appointments_needing_reminders(self, hours_ahead: int = 24) -> List[Dict]:
+        try:
+            now = datetime.now(timezone.utc)
+            reminder_time = now + timedelta(hours=hours_ahead)
+            query = (
+                self.db.collection(self.appointments_collection)
+                .where("reminder_sent", "==", False)
+                .where("active", "==", True)
+                .where("appointment_time", ">=", now)
+                .where("appointment_time", "<=", reminder_time)
+            )
+            return [{**doc.to_dict(), "id": doc.id} for doc in query.stream()]
+        except Exception as e:
+            logger.warning("Error getting appointments needing reminders: %s", e)
+            return []
+
+    # ------------------------------------------------------------------
+    # Async variants - used by the outbound callers so Firestore reads
+    # overlap with other in-flight calls instead of stalling the loop
+    # ------------------------------------------------------------------
+
+    async def get_appointment_by_id_async(self, appointment_id: str) -> Optional[Dict]:
+        try:
+            doc = await (
+                self.async_db.collection(self.appointments_collection)
+                .document(appointment_id)
+                .get()
+            )
+            if doc.exists:
+                appointment_data = doc.to_dict()
+                appointment_data["id"] = doc.id
+                return appointment_data
+            return None
+        except Exception as e:
+            logger.warning("Error getting appointment: %s", e)
+            return None
+
+    async def get_client_by_id_async(self, client_id: str) -> Optional[Dict]:
+        try:
+            doc = await (
+                self.async_db.collection(self.clients_collection)
+                .document(client_id)
+                .get()
+            )
+            if doc.exists:
+                client_data = doc.to_dict()
+                client_data["id"] = doc.id
+                return client_data
+            return None
+        except Exception as e:
+            logger.warning("Error getting client: %s", e)
+            return None
+
+    async def get_clients_by_ids_async(self, client_ids: List[str]) -> Dict[str, Dict]:
+        """Async twin of `get_clients_by_ids`: one batched get_all RPC."""
+        result: Dict[str, Dict] = {}
+        if not client_ids:
+            return result
+        try:
+            refs = [
+                self.async_db.collection(self.clients_collection).document(client_id)
+                for client_id in dict.fromkeys(client_ids)
+            ]
+            async for doc in self.async_db.get_all(refs):
+                if doc.exists:
+                    client_data = doc.to_dict()
+                    client_data["id"] = doc.id
+                    result[doc.id] = client_data
+            return result
+        except Exception as e:
+            logger.warning("Error getting clients in bulk: %s", e)
+            return result
+
+    async def get_appointments_needing_reminders_async(
+        self, hours_ahead: int = 24
+    ) -> List[Dict]:
+        try:
+            now = datetime.now(timezone.utc)
+            reminder_time = now + timedelta(hours=hours_ahead)
+            query = (
+                self.async_db.collection(self.appointments_collection)
+                .where("reminder_sent", "==", False)
+                .where("active", "==", True)
+                .where("appointment_time", ">=", now)
+                .where("appointment_time", "<=", reminder_time)
+            )
+            appointments = []
+            async for doc in query.stream():
+                appointment_data = doc.to_dict()
+                appointment_data["id"] = doc.id
+                appointments.append(appointment_data)
+            return appointments
+        except Exception as e:
+            logger.warning("Error getting appointments needing reminders: %s", e)
+            return []
+
+    async def mark_reminder_sent_async(self, appointment_id: str) -> bool:
+        try:
+            await self.async_db.collection(self.appointments_collection).document(
+                appointment_id
+            ).update({"reminder_sent": True, "updated_at": datetime.now(timezone.utc)})
+            return True
+        except Exception as e:
+            logger.warning("Error marking reminder sent: %s", e)
+            return False
+
+    def _busy_intervals(self, date: datetime, trainer_id: str) -> List[tuple]:
+        """Booked (start, end) pairs for the day, ordered by start time.
+
+        The query window is built naive, matching the wall-time
+        convention the write path stores; aware bounds would shift the
+        window by the UTC offset and miss the day's bookings.
+        """
+        day = _grid_day(date)
+        day_start = datetime.combine(day, _DAY_OPEN_TIME)
+        day_end = datetime.combine(day, _DAY_CLOSE_TIME)
+        try:
+            # Only the two fields the overlap math needs cross the wire;
+            # notes, client ids and the rest of the doc stay server-side.
+            query = (
+                self.db.collection(self.appointments_collection)
+                .where("trainer_id", "==", trainer_id)
+                .where("status", "in", ["scheduled", "confirmed"])
+                .where("appointment_time", ">=", day_start)
+                .where("appointment_time", "<", day_end)
+                .order_by("appointment_time")
+                .select(["appointment_time", "duration_minutes"])
+            )
+            busy_slots = []
+            for doc in query.stream():
+                appointment = doc.to_dict()
+                # Endpoints stay in the shape Firestore hands back
+                # (aware, mislabeled UTC); callers run them through
+                # _to_grid_tz before comparing against the grid.
+                start = appointment["appointment_time"]
+                end = start + timedelta(minutes=appointment.get("duration_minutes", 60))
+                busy_slots.append((start, end))
+            return busy_slots
+        except Exception as e:
+            logger.warning("Error getting available slots: %s", e)
+            return []
+
+    def iter_available_slots(
+        self,
+        date: datetime,
+        duration_minutes: int = 60,
+        trainer_id: str = "default",
+    ) -> Iterator[datetime]:
+        """Yield free slots on `date` between business hours (9 AM - 6 PM).
+
+        Lazy on purpose: the agent only ever offers the first few openings,
+        so generating the whole day up front is wasted work. The busy list
+        comes back already ordered by start time from a single range query.
+        """
+        day = _grid_day(date)
+        day_end = _TZ.localize(datetime.combine(day, _DAY_CLOSE_TIME))
+        busy_slots = [
+            (_to_grid_tz(start), _to_grid_tz(end))
+            for start, end in self._busy_intervals(date, trainer_id)
+        ]
+
+        # Candidate starts ascend and busy slots arrive ordered by start,
+        # so one index swept forward replaces the per-slot scan of every
+        # busy interval: O(slots + busy) instead of O(slots * busy).
+        slot_length = timedelta(minutes=duration_minutes)
+        busy_index = 0
+        busy_count = len(busy_slots)
+        for current_time in _candidate_starts(day):
+            slot_end = current_time + slot_length
+            if slot_end > day_end:
+                break
+            while busy_index < busy_count and busy_slots[busy_index][1] <= current_time:
+                busy_index += 1
+            if busy_index < busy_count and busy_slots[busy_index][0] < slot_end:
+                continue
+            yield current_time
+
+    def get_available_slots(
+        self,
+        date: datetime,
+        duration_minutes: int = 60,
+        trainer_id: str = "default",
+    ) -> List[datetime]:
+        """Materialized form of `iter_available_slots` for list callers.
+
+        When numba is installed the whole-day sweep runs through the
+        compiled integer kernel in utils._slots_numba; without it the
+        lazy generator is just drained (same algorithm, interpreted).
+        """
+        if not HAVE_NUMBA:
+            return list(self.iter_available_slots(date, duration_minutes, trainer_id))
+
+        try:
+            import numpy as np
+
+            busy_slots = [
+                (_to_grid_tz(start), _to_grid_tz(end))
+                for start, end in self._busy_intervals(date, trainer_id)
+            ]
+            # Aware midnight in the grid timezone: the busy endpoints are
+            # re-localized above, so the subtraction stays aware-vs-aware
+            # regardless of what the caller passed in.
+            midnight = _TZ.localize(
+                datetime.combine(_grid_day(date), datetime.min.time())
+            )
+            busy_starts = np.array(
+                [int((start - midnight).total_seconds()) for start, _ in busy_slots],
+                dtype=np.int64,
+            )
+            busy_ends = np.array(
+                [int((end - midnight).total_seconds()) for _, end in busy_slots],
+                dtype=np.int64,
+            )
+            offsets = free_slot_offsets(
+                9 * 3600,
+                18 * 3600,
+                duration_minutes * 60,
+                30 * 60,
+                busy_starts,
+                busy_ends,
+            )
+            return [midnight + timedelta(seconds=int(offset)) for offset in offsets]
+        except Exception as e:
+            logger.warning("Error getting available slots: %s", e)
+            return []
+
+    def get_first_available_slots(
+        self,
+        date: datetime,
+        limit: int = 5,
+        duration_minutes: int = 60,
+        trainer_id: str = "default",
+    ) -> List[datetime]:
+        """First `limit` openings - stops generating as soon as it has them."""
+        return list(
+            islice(self.iter_available_slots(date, duration_minutes, trainer_id), limit)
+        )
+
+    def update_appointment_status(self, appointment_id: str, status: str) -> bool:
+        try:
+            self.db.collection(self.appointments_collection).document(
+                appointment_id
+            ).update(
+                {
+                    "status": status,
+                    "active": status in ("scheduled", "confirmed"),
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            )
+            return True
+        except Exception as e:
+            logger.warning("Error updating appointment status: %s", e)
+            return False
+
+    def cancel_appointment(self, appointment_id: str) -> bool:
+        try:
+            self.db.collection(self.appointments_collection).document(
+                appointment_id
+            ).update(
+                {
+                    "status": "cancelled",
+                    "active": False,
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            )
+            return True
+        except Exception as e:
+            logger.warning("Error cancelling appointment: %s", e)
+            return False
+
+    def reschedule_appointment(
+        self, appointment_id: str, new_time: datetime
+    ) -> bool:
+        try:
+            self.db.collection(self.appointments_collection).document(
+                appointment_id
+            ).update(
+                {
+                    "appointment_time": new_time,
+                    "reminder_sent": False,
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            )
+            return True
+        except Exception as e:
+            logger.warning("Error rescheduling appointment: %s", e)
+            return False
+
+    def mark_reminder_sent(self, appointment_id: str) -> bool:
+        try:
+            self.db.collection(self.appointments_collection).document(
+                appointment_id
+            ).update({"reminder_sent": True, "updated_at": datetime.now(timezone.utc)})
+            return True
+        except Exception as e:
+            logger.warning("Error marking reminder sent: %s", e)
+            return False
+
+
+# Shared manager instance used by the agents and the scheduler
+appointment_manager = AppointmentManager()
@@ -0,0 +1,1137 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from typing import Dict, Iterator, List, Optional
+
+
+try:
+    import numpy as np
+except ImportError:  # optional; the pure-Python sweep covers it
+    np = None
+
+from firebase_config import firebase_config
+
+logger = logging.getLogger(__name__)
+
+UTC = timezone.utc
+
+# Trainer document id used when no trainer is specified
+DEFAULT_TRAINER_ID = "8QYQXt91Kzf4j4w0i2kogb4zEyN2"
+
+# In-process cache for stable lookups (trainers, clients by id or phone).
+# These are hit on every conversational turn and health probe but change
+# on the scale of minutes, so a short TTL removes most Firestore reads.
+_CACHE_TTL_SECONDS = 300
+_CACHE_MAX_ENTRIES = 1024
+
+# Trainers change hourly-to-daily at most, so they get a much longer TTL;
+# coherence comes from the snapshot listener below rather than TTL churn.
+_TRAINER_CACHE_TTL_SECONDS = 3600
+
+# Field mask for session listings: the API and agent only ever use these,
+# so projected queries skip notes/audit fields and shrink each doc on the
+# wire.
+SESSION_LIST_FIELDS = [
+    "clientId",
+    "trainerId",
+    "dateTime",
+    "durationMinutes",
+    "serviceType",
+    "status",
+]
+
+
+def _align_tz(value: datetime, ref: datetime) -> datetime:
+    """Give `value` the same tz-awareness as `ref` so they compare.
+
+    Firestore returns aware UTC datetimes while the agent passes naive
+    local ones; mixing the two raises TypeError. Naive refs get the tag
+    stripped (the same normalization the cancel handler applies with
+    replace(tzinfo=None)); aware refs get the value converted into
+    their zone.
+    """
+    if ref.tzinfo is None:
+        if value.tzinfo is not None:
+            return value.replace(tzinfo=None)
+        return value
+    if value.tzinfo is None:
+        return value.replace(tzinfo=ref.tzinfo)
+    return value.astimezone(ref.tzinfo)
+
+
+# Firestore caps a WriteBatch at 500 operations; larger updates are
+# split into consecutive commits.
+_MAX_BATCH_OPS = 500
+
+# The booking day is a fixed grid: 18 half-hour cells between 09:00 and
+# 18:00. Small enough that a whole day's occupancy fits in one int and
+# conflict checks become bit operations.
+_SLOT_COUNT = 18
+_SLOT_SECONDS = 1800
+
+# Pipelining window: ops enqueued within this many seconds of each other
+# ride the same RPC. Long enough to coalesce a burst of awaits scheduled
+# in the same tick, short enough to be invisible next to network RTT.
+_PIPELINE_WINDOW_SECONDS = 0.002
+_PIPELINE_MAX_OPS = 50
+
+
+class PipelinedSessionClient:
+    """Coalesces independent point reads and writes into batched RPCs.
+
+    Async handlers that each need one document end up issuing one RPC per
+    await; enqueueing through this client instead buffers the refs for a
+    ~2ms window (or until 50 ops) and flushes reads as a single get_all
+    stream and writes as a single batch commit. Callers just await the
+    returned future - the coalescing is invisible apart from the latency
+    win.
+
+    Only useful from inside a running event loop; the sync getters on
+    SessionManager are unaffected.
+    """
+
+    def __init__(self, manager: "SessionManager"):
+        self._manager = manager
+        self._reads = []  # (ref, future)
+        self._writes = []  # (ref, data, future)
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def enqueue_get(self, ref) -> "asyncio.Future":
+        """Queue a document read; resolves to the merged dict or None."""
+        future = asyncio.get_running_loop().create_future()
+        self._reads.append((ref, future))
+        self._schedule_flush()
+        return future
+
+    def enqueue_write(self, ref, data: Dict) -> "asyncio.Future":
+        """Queue a document set; resolves to True once the batch commits."""
+        future = asyncio.get_running_loop().create_future()
+        self._writes.append((ref, data, future))
+        self._schedule_flush()
+        return future
+
+    def _schedule_flush(self) -> None:
+        if len(self._reads) + len(self._writes) >= _PIPELINE_MAX_OPS:
+            if self._flush_task is not None:
+                self._flush_task.cancel()
+                self._flush_task = None
+            asyncio.get_running_loop().create_task(self._flush())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(
+                self._flush(delay=_PIPELINE_WINDOW_SECONDS)
+            )
+
+    async def _flush(self, delay: float = 0.0) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        self._flush_task = None
+        reads, self._reads = self._reads, []
+        writes, self._writes = self._writes, []
+
+        if reads:
+            pending: Dict[str, list] = {}
+            for ref, future in reads:
+                pending.setdefault(ref.path, []).append(future)
+            try:
+                db = self._manager.async_db
+                async for snap in db.get_all([ref for ref, _ in reads]):
+                    value = (
+                        {**snap.to_dict(), "id": snap.id} if snap.exists else None
+                    )
+                    for future in pending.pop(snap.reference.path, ()):
+                        future.set_result(value)
+                # Anything get_all didn't echo back does not exist
+                for futures in pending.values():
+                    for future in futures:
+                        future.set_result(None)
+            except Exception as e:
+                for futures in pending.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(e)
+
+        if writes:
+            try:
+                batch = self._manager.async_db.batch()
+                for ref, data, _ in writes:
+                    batch.set(ref, data, merge=True)
+                await batch.commit()
+                for _, _, future in writes:
+                    future.set_result(True)
+            except Exception as e:
+                for _, _, future in writes:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+class SessionManager:
+    """Firestore-backed storage for the training-session data model.
+
+    Field names follow the camelCase convention already used by the web
+    dashboard (clientId, dateTime, sessionsRemaining, ...), so both apps
+    can share the same collections.
+    """
+
+    def __init__(self):
+        self.users_collection = "users"
+        self.clients_collection = "clients"
+        self.sessions_collection = "sessions"
+        self.payments_collection = "payments"
+        # Reverse index {phone -> clientId}: turns the phone lookup into a
+        # direct document get instead of an indexed where-query.
+        self.clients_by_phone_collection = "clients_by_phone"
+        self.training_plans_collection = "training_plans"
+        self.workout_logs_collection = "workout_logs"
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._trainer_watch = None
+        self.pipeline = PipelinedSessionClient(self)
+
+    @property
+    def db(self):
+        # Resolved lazily so importing this module doesn't connect to
+        # Firestore; the client is created once on first use.
+        return firebase_config.get_db()
+
+    @property
+    def async_db(self):
+        return firebase_config.get_async_db()
+
+    # Collection references are immutable handles; building them once per
+    # manager (lazily, so imports still don't touch Firestore) skips the
+    # path parse and object construction on every read/write.
+    @cached_property
+    def users_ref(self):
+        return self.db.collection(self.users_collection)
+
+    @cached_property
+    def clients_ref(self):
+        return self.db.collection(self.clients_collection)
+
+    @cached_property
+    def sessions_ref(self):
+        return self.db.collection(self.sessions_collection)
+
+    @cached_property
+    def clients_by_phone_ref(self):
+        return self.db.collection(self.clients_by_phone_collection)
+
+    # ------------------------------------------------------------------
+    # Read cache
+    # ------------------------------------------------------------------
+
+    def _cache_get(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._cache[key]
+            return None
+        return value
+
+    def _cache_put(self, key, value, ttl: float = _CACHE_TTL_SECONDS) -> None:
+        self._cache[key] = (time.time() + ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > _CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+
+    def start_trainer_watch(self) -> None:
+        """Invalidate cached trainers when their documents change.
+
+        A single on_snapshot listener on the users collection keeps the
+        long-TTL trainer cache coherent without polling: any server-side
+        edit pops the affected key, and the next read re-populates it.
+        """
+        if self._trainer_watch is not None:
+            return
+
+        def _on_change(col_snapshot, changes, read_time):
+            for change in changes:
+                self._cache.pop(("trainer", change.document.id), None)
+
+        try:
+            self._trainer_watch = self.users_ref.on_snapshot(_on_change)
+        except Exception as e:
+            logger.warning("Error starting trainer watch: %s", e)
+
+    def stop_trainer_watch(self) -> None:
+        if self._trainer_watch is not None:
+            self._trainer_watch.unsubscribe()
+            self._trainer_watch = None
+
+    def _invalidate_client(self, client_id: str) -> None:
+        self._cache.pop(("client", client_id), None)
+        stale = [
+            key
+            for key, (_, value) in self._cache.items()
+            if key[0] == "phone" and value and value.get("id") == client_id
+        ]
+        for key in stale:
+            del self._cache[key]
+
+    # ------------------------------------------------------------------
+    # Trainers / clients
+    # ------------------------------------------------------------------
+
+    def get_trainer_by_id(self, trainer_id: str) -> Optional[Dict]:
+        cached = self._cache_get(("trainer", trainer_id))
+        if cached is not None:
+            return cached
+        try:
+            doc = self.users_ref.document(trainer_id).get()
+            if doc.exists:
+                trainer_data = {**doc.to_dict(), "id": doc.id}
+                self._cache_put(
+                    ("trainer", trainer_id),
+                    trainer_data,
+                    ttl=_TRAINER_CACHE_TTL_SECONDS,
+                )
+                return trainer_data
+            return None
+        except Exception as e:
+            logger.warning("Error getting trainer: %s", e)
+            return None
+
+    def create_client(
+        self,
+        name: str,
+        phone: str,
+        trainer_id: str = DEFAULT_TRAINER_ID,
+        sessions_remaining: int = 0,
+    ) -> Optional[str]:
+        try:
+            now = datetime.now(UTC)
+            client_data = {
+                "name": name,
+                "phone": phone,
+                "trainerId": trainer_id,
+                "sessionsRemaining": sessions_remaining,
+                "createdAt": now,
+                "updatedAt": now,
+            }
+            doc_ref = self.clients_ref.document()
+            batch = self.db.batch()
+            batch.set(doc_ref, client_data)
+            batch.set(
+                self.clients_by_phone_ref.document(phone),
+                {"clientId": doc_ref.id},
+            )
+            batch.commit()
+            self._cache.pop(("phone", phone), None)
+            return doc_ref.id
+        except Exception as e:
+            logger.warning("Error creating client: %s", e)
+            return None
+
+    def create_client_with_session(
+        self,
+        name: str,
+        phone: str,
+        date_time: datetime,
+        trainer_id: str = DEFAULT_TRAINER_ID,
+        sessions_remaining: int = 0,
+        duration_minutes: int = 60,
+        service_type: str = "personal_training",
+        notes: str = "",
+    ) -> Optional[tuple]:
+        """Create a new client and their first session in one batched commit.
+
+        Onboarding a caller always does both writes back to back; batching
+        them means one round-trip and the pair lands atomically, so there
+        is never a client without their booked session (or vice versa).
+        Returns (client_id, session_id), or None on failure.
+        """
+        try:
+            now = datetime.now(UTC)
+            client_ref = self.clients_ref.document()
+            session_ref = self.sessions_ref.document()
+            batch = self.db.batch()
+            batch.set(
+                client_ref,
+                {
+                    "name": name,
+                    "phone": phone,
+                    "trainerId": trainer_id,
+                    "sessionsRemaining": sessions_remaining,
+                    "createdAt": now,
+                    "updatedAt": now,
+                },
+            )
+            batch.set(
+                session_ref,
+                {
+                    "clientId": client_ref.id,
+                    "trainerId": trainer_id,
+                    "dateTime": date_time,
+                    "durationMinutes": duration_minutes,
+                    "serviceType": service_type,
+                    "status": "scheduled",
+                    "notes": notes,
+                    "autoReminderSent": False,
+                    "createdAt": now,
+                    "updatedAt": now,
+                },
+            )
+            batch.set(
+                self.clients_by_phone_ref.document(phone),
+                {"clientId": client_ref.id},
+            )
+            batch.commit()
+            self._cache.pop(("phone", phone), None)
+            return client_ref.id, session_ref.id
+        except Exception as e:
+            logger.warning("Error creating client with session: %s", e)
+            return None
+
+    def get_client_by_id(self, client_id: str) -> Optional[Dict]:
+        cached = self._cache_get(("client", client_id))
+        if cached is not None:
+            return cached
+        try:
+            doc = self.clients_ref.document(client_id).get()
+            if doc.exists:
+                client_data = {**doc.to_dict(), "id": doc.id}
+                self._cache_put(("client", client_id), client_data)
+                return client_data
+            return None
+        except Exception as e:
+            logger.warning("Error getting client: %s", e)
+            return None
+
+    def get_client_by_phone(self, phone: str) -> Optional[Dict]:
+        """Resolve a caller's client record from their phone number.
+
+        Tries the clients_by_phone reverse index first (two point reads,
+        no query); clients created before the index existed fall back to
+        the where-query and get their index doc backfilled on the way
+        out, so the slow path only ever runs once per legacy client.
+        """
+        cached = self._cache_get(("phone", phone))
+        if cached is not None:
+            return cached
+        try:
+            index_snap = (
+                self.clients_by_phone_ref
+                .document(phone)
+                .get()
+            )
+            if index_snap.exists:
+                client_data = self.get_client_by_id(
+                    index_snap.to_dict()["clientId"]
+                )
+                if client_data is not None:
+                    self._cache_put(("phone", phone), client_data)
+                return client_data
+
+            query = (
+                self.clients_ref
+                .where("phone", "==", phone)
+                .limit(1)
+            )
+            docs = query.get()
+            for doc in docs:
+                client_data = {**doc.to_dict(), "id": doc.id}
+                self.clients_by_phone_ref.document(
+                    phone
+                ).set({"clientId": doc.id})
+                self._cache_put(("phone", phone), client_data)
+                return client_data
+            return None
+        except Exception as e:
+            logger.warning("Error finding client by phone: %s", e)
+            return None
+
+    def update_client_sessions_remaining(
+        self, client_id: str, sessions_remaining: int
+    ) -> bool:
+        try:
+            self.clients_ref.document(client_id).update(
+                {
+                    "sessionsRemaining": sessions_remaining,
+                    "updatedAt": datetime.now(UTC),
+                }
+            )
+            self._invalidate_client(client_id)
+            return True
+        except Exception as e:
+            logger.warning("Error updating sessions remaining: %s", e)
+            return False
+
+    def get_docs_bulk(self, refs) -> Dict[str, Dict]:
+        """Fetch many document references in one RPC; returns {id: doc}.
+
+        `db.get_all` streams every snapshot over a single round-trip, so
+        hydrating N related docs costs one network trip instead of N.
+        """
+        try:
+            return {
+                snap.id: {**snap.to_dict(), "id": snap.id}
+                for snap in self.db.get_all(refs)
+                if snap.exists
+            }
+        except Exception as e:
+            logger.warning("Error bulk-fetching documents: %s", e)
+            return {}
+
+    def get_clients_by_ids(self, client_ids: List[str]) -> Dict[str, Dict]:
+        """Batched get_client_by_id; one get_all RPC for the whole id list."""
+        collection = self.clients_ref
+        refs = [
+            collection.document(client_id)
+            for client_id in dict.fromkeys(client_ids)
+        ]
+        return self.get_docs_bulk(refs)
+
+    def get_client_sessions_remaining(self, client_id: str) -> int:
+        # Only one integer is needed, so ask Firestore for just that field
+        # instead of pulling the whole client doc over the wire. A cached
+        # full doc is still the cheapest answer when we already have one.
+        cached = self._cache_get(("client", client_id))
+        if cached is not None:
+            return cached.get("sessionsRemaining", 0)
+        try:
+            snap = (
+                self.clients_ref
+                .document(client_id)
+                .get(field_paths=["sessionsRemaining"])
+            )
+            if snap.exists:
+                return snap.to_dict().get("sessionsRemaining", 0)
+            return 0
+        except Exception as e:
+            logger.warning("Error getting sessions remaining: %s", e)
+            return 0
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+
+    def create_session(
+        self,
+        client_id: str,
+        date_time: datetime,
+        duration_minutes: int = 60,
+        trainer_id: str = DEFAULT_TRAINER_ID,
+        service_type: str = "personal_training",
+        notes: str = "",
+    ) -> Optional[str]:
+        try:
+            now = datetime.now(UTC)
+            session_data = {
+                "clientId": client_id,
+                "trainerId": trainer_id,
+                "dateTime": date_time,
+                "durationMinutes": duration_minutes,
+                "serviceType": service_type,
+                "status": "scheduled",
+                "notes": notes,
+                "autoReminderSent": False,
+                "createdAt": now,
+                "updatedAt": now,
+            }
+            doc_ref = self.sessions_ref.document()
+            doc_ref.set(session_data)
+            return doc_ref.id
+        except Exception as e:
+            logger.warning("Error creating session: %s", e)
+            return None
+
+    def create_session_and_decrement(
+        self,
+        client_id: str,
+        date_time: datetime,
+        new_remaining: Optional[int] = None,
+        duration_minutes: int = 60,
+        trainer_id: str = DEFAULT_TRAINER_ID,
+        service_type: str = "personal_training",
+        notes: str = "",
+    ) -> Optional[str]:
+        """Create a session and update the client's remaining count in one
+        batched commit.
+
+        Pass `new_remaining=None` to skip the counter write (e.g. walk-ins
+        with no prepaid package). One network round-trip instead of two,
+        and the pair lands atomically.
+        """
+        try:
+            now = datetime.now(UTC)
+            session_data = {
+                "clientId": client_id,
+                "trainerId": trainer_id,
+                "dateTime": date_time,
+                "durationMinutes": duration_minutes,
+                "serviceType": service_type,
+                "status": "scheduled",
+                "notes": notes,
+                "autoReminderSent": False,
+                "createdAt": now,
+                "updatedAt": now,
+            }
+            session_ref = self.sessions_ref.document()
+            batch = self.db.batch()
+            batch.set(session_ref, session_data)
+            if new_remaining is not None:
+                client_ref = self.clients_ref.document(
+                    client_id
+                )
+                batch.update(
+                    client_ref,
+                    {"sessionsRemaining": new_remaining, "updatedAt": now},
+                )
+            batch.commit()
+            if new_remaining is not None:
+                self._invalidate_client(client_id)
+            return session_ref.id
+        except Exception as e:
+            logger.warning("Error creating session with decrement: %s", e)
+            return None
+
+    def get_session_by_id(self, session_id: str) -> Optional[Dict]:
+        try:
+            doc = (
+                self.sessions_ref.document(session_id).get()
+            )
+            if doc.exists:
+                return {**doc.to_dict(), "id": doc.id}
+            return None
+        except Exception as e:
+            logger.warning("Error getting session: %s", e)
+            return None
+
+    def count_scheduled_sessions(self, client_id: str) -> int:
+        """Count a client's scheduled sessions without fetching them.
+
+        Runs a server-side count() aggregation, so only the scalar comes
+        back - no documents cross the wire regardless of how many match.
+        """
+        try:
+            query = (
+                self.sessions_ref
+                .where("clientId", "==", client_id)
+                .where("status", "==", "scheduled")
+            )
+            result = query.count().get()
+            return int(result[0][0].value)
+        except Exception as e:
+            logger.warning("Error counting scheduled sessions: %s", e)
+            return 0
+
+    def iter_sessions_for_client(self, client_id: str) -> Iterator[Dict]:
+        """Yield a client's sessions one doc at a time via .stream().
+
+        Streaming keeps only one document in memory at a time, so callers
+        that just iterate (or stop early) never pay for the full result
+        set; the list variants below materialize it explicitly.
+        """
+        query = (
+            self.sessions_ref
+            .where("clientId", "==", client_id)
+            .select(SESSION_LIST_FIELDS)
+            .order_by("dateTime")
+        )
+        for doc in query.stream():
+            yield {**doc.to_dict(), "id": doc.id}
+
+    def get_sessions_for_client(self, client_id: str) -> List[Dict]:
+        try:
+            return list(self.iter_sessions_for_client(client_id))
+        except Exception as e:
+            logger.warning("Error getting sessions for client: %s", e)
+            return []
+
+    def iter_upcoming_sessions(
+        self, trainer_id: str = DEFAULT_TRAINER_ID, days_ahead: int = 7
+    ) -> Iterator[Dict]:
+        """Streaming variant of get_upcoming_sessions."""
+        now = datetime.now(UTC)
+        end = now + timedelta(days=days_ahead)
+        query = (
+            self.sessions_ref
+            .where("trainerId", "==", trainer_id)
+            .where("dateTime", ">=", now)
+            .where("dateTime", "<=", end)
+            .select(SESSION_LIST_FIELDS)
+            .order_by("dateTime")
+        )
+        for doc in query.stream():
+            yield {**doc.to_dict(), "id": doc.id}
+
+    def get_upcoming_sessions(
+        self, trainer_id: str = DEFAULT_TRAINER_ID, days_ahead: int = 7
+    ) -> List[Dict]:
+        try:
+            return list(self.iter_upcoming_sessions(trainer_id, days_ahead))
+        except Exception as e:
+            logger.warning("Error getting upcoming sessions: %s", e)
+            return []
+
+    def get_upcoming_sessions_page(
+        self,
+        trainer_id: str = DEFAULT_TRAINER_ID,
+        days_ahead: int = 7,
+        page_size: int = 50,
+        start_after: Optional[str] = None,
+    ) -> "tuple[List[Dict], Optional[str]]":
+        """Page through upcoming sessions with a resumable cursor.
+
+        Returns (sessions, next_cursor): pass next_cursor back as
+        `start_after` to fetch the following page; None means the listing
+        is exhausted. Bounds both memory and query latency regardless of
+        how busy the trainer is, unlike get_upcoming_sessions which
+        materializes the whole window.
+        """
+        try:
+            now = datetime.now(UTC)
+            end = now + timedelta(days=days_ahead)
+            query = (
+                self.sessions_ref
+                .where("trainerId", "==", trainer_id)
+                .where("dateTime", ">=", now)
+                .where("dateTime", "<=", end)
+                .select(SESSION_LIST_FIELDS)
+                .order_by("dateTime")
+            )
+            if start_after is not None:
+                cursor_snap = self.sessions_ref.document(start_after).get()
+                if cursor_snap.exists:
+                    query = query.start_after(cursor_snap)
+            sessions = [
+                {**doc.to_dict(), "id": doc.id}
+                for doc in query.limit(page_size).stream()
+            ]
+            next_cursor = sessions[-1]["id"] if len(sessions) == page_size else None
+            return sessions, next_cursor
+        except Exception as e:
+            logger.warning("Error paging upcoming sessions: %s", e)
+            return [], None
+
+    def iter_sessions_needing_reminders(self, hours_ahead: int = 24) -> Iterator[Dict]:
+        """Streaming variant of get_sessions_needing_reminders."""
+        now = datetime.now(UTC)
+        reminder_time = now + timedelta(hours=hours_ahead)
+        # All filtering happens server-side against the composite index
+        # declared in firestore.indexes.json, so only the sessions that
+        # actually need a reminder come over the wire.
+        query = (
+            self.sessions_ref
+            .where("trainerId", "==", DEFAULT_TRAINER_ID)
+            .where("autoReminderSent", "==", False)
+            .where("status", "in", ["scheduled", "confirmed"])
+            .where("dateTime", ">=", now)
+            .where("dateTime", "<=", reminder_time)
+        )
+        for doc in query.stream():
+            yield {**doc.to_dict(), "id": doc.id}
+
+    def get_sessions_needing_reminders(self, hours_ahead: int = 24) -> List[Dict]:
+        try:
+            return list(self.iter_sessions_needing_reminders(hours_ahead))
+        except Exception as e:
+            logger.warning("Error getting sessions needing reminders: %s", e)
+            return []
+
+    async def _get_doc_async(self, collection: str, doc_id: str) -> Optional[Dict]:
+        """Point read on the async client; shared by the `_async` getters."""
+        doc = await self.async_db.collection(collection).document(doc_id).get()
+        if doc.exists:
+            return {**doc.to_dict(), "id": doc.id}
+        return None
+
+    async def get_client_by_id_async(self, client_id: str) -> Optional[Dict]:
+        """Async twin of get_client_by_id."""
+        try:
+            return await self._get_doc_async(self.clients_collection, client_id)
+        except Exception as e:
+            logger.warning("Error getting client: %s", e)
+            return None
+
+    async def get_trainer_by_id_async(self, trainer_id: str) -> Optional[Dict]:
+        """Async twin of get_trainer_by_id."""
+        try:
+            return await self._get_doc_async(self.users_collection, trainer_id)
+        except Exception as e:
+            logger.warning("Error getting trainer: %s", e)
+            return None
+
+    async def get_session_by_id_async(self, session_id: str) -> Optional[Dict]:
+        """Async twin of get_session_by_id."""
+        try:
+            return await self._get_doc_async(self.sessions_collection, session_id)
+        except Exception as e:
+            logger.warning("Error getting session: %s", e)
+            return None
+
+    async def get_client_by_id_pipelined(self, client_id: str) -> Optional[Dict]:
+        """get_client_by_id_async through the coalescing pipeline.
+
+        Concurrent awaits landing in the same ~2ms window share one
+        get_all RPC instead of issuing a point read each.
+        """
+        ref = self.async_db.collection(self.clients_collection).document(client_id)
+        return await self.pipeline.enqueue_get(ref)
+
+    async def get_session_by_id_pipelined(self, session_id: str) -> Optional[Dict]:
+        """get_session_by_id_async through the coalescing pipeline."""
+        ref = self.async_db.collection(self.sessions_collection).document(session_id)
+        return await self.pipeline.enqueue_get(ref)
+
+    async def get_many_clients(self, client_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch several client docs concurrently; returns {id: doc}.
+
+        Independent point reads are gathered so the total latency is the
+        slowest single round-trip rather than the sum of all of them.
+        """
+        unique_ids = list(dict.fromkeys(client_ids))
+        results = await asyncio.gather(
+            *(self.get_client_by_id_async(client_id) for client_id in unique_ids),
+            return_exceptions=True,
+        )
+        clients = {}
+        for client_id, result in zip(unique_ids, results):
+            if isinstance(result, Exception):
+                logger.warning("Error getting client %s: %s", client_id, result)
+            elif result is not None:
+                clients[client_id] = result
+        return clients
+
+    async def get_many_sessions(self, session_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch several session docs concurrently; returns {id: doc}."""
+        unique_ids = list(dict.fromkeys(session_ids))
+        results = await asyncio.gather(
+            *(self.get_session_by_id_async(session_id) for session_id in unique_ids),
+            return_exceptions=True,
+        )
+        sessions = {}
+        for session_id, result in zip(unique_ids, results):
+            if isinstance(result, Exception):
+                logger.warning("Error getting session %s: %s", session_id, result)
+            elif result is not None:
+                sessions[session_id] = result
+        return sessions
+
+    async def get_sessions_for_client_async(self, client_id: str) -> List[Dict]:
+        """Async twin of get_sessions_for_client for the API handlers."""
+        try:
+            query = (
+                self.async_db.collection(self.sessions_collection)
+                .where("clientId", "==", client_id)
+                .select(SESSION_LIST_FIELDS)
+                .order_by("dateTime")
+            )
+            return [
+                {**doc.to_dict(), "id": doc.id} async for doc in query.stream()
+            ]
+        except Exception as e:
+            logger.warning("Error getting sessions for client: %s", e)
+            return []
+
+    async def get_upcoming_sessions_async(
+        self, trainer_id: str = DEFAULT_TRAINER_ID, days_ahead: int = 7
+    ) -> List[Dict]:
+        """Async twin of get_upcoming_sessions for the API handlers."""
+        try:
+            now = datetime.now(UTC)
+            end = now + timedelta(days=days_ahead)
+            query = (
+                self.async_db.collection(self.sessions_collection)
+                .where("trainerId", "==", trainer_id)
+                .where("dateTime", ">=", now)
+                .where("dateTime", "<=", end)
+                .select(SESSION_LIST_FIELDS)
+                .order_by("dateTime")
+            )
+            return [
+                {**doc.to_dict(), "id": doc.id} async for doc in query.stream()
+            ]
+        except Exception as e:
+            logger.warning("Error getting upcoming sessions: %s", e)
+            return []
+
+    async def get_sessions_needing_reminders_async(
+        self, hours_ahead: int = 24
+    ) -> List[Dict]:
+        """Async twin of get_sessions_needing_reminders."""
+        try:
+            now = datetime.now(UTC)
+            reminder_time = now + timedelta(hours=hours_ahead)
+            query = (
+                self.async_db.collection(self.sessions_collection)
+                .where("trainerId", "==", DEFAULT_TRAINER_ID)
+                .where("autoReminderSent", "==", False)
+                .where("status", "in", ["scheduled", "confirmed"])
+                .where("dateTime", ">=", now)
+                .where("dateTime", "<=", reminder_time)
+            )
+            return [
+                {**doc.to_dict(), "id": doc.id} async for doc in query.stream()
+            ]
+        except Exception as e:
+            logger.warning("Error getting sessions needing reminders: %s", e)
+            return []
+
+    def get_available_slots(
+        self,
+        date: datetime,
+        duration_minutes: int = 60,
+        trainer_id: str = DEFAULT_TRAINER_ID,
+    ) -> List[datetime]:
+        """Return free slots on `date` between business hours (9 AM - 6 PM)."""
+        try:
+            day_start = date.replace(hour=9, minute=0, second=0, microsecond=0)
+            day_end = date.replace(hour=18, minute=0, second=0, microsecond=0)
+
+            query = (
+                self.sessions_ref
+                .where("trainerId", "==", trainer_id)
+                .where("status", "in", ["scheduled", "confirmed"])
+                .where("dateTime", ">=", day_start)
+                .where("dateTime", "<", day_end)
+            )
+            docs = query.get()
+            # Firestore hands back aware dateTime values while callers
+            # usually pass a naive date; align the endpoints with
+            # day_start before any arithmetic so none of the three
+            # conflict-check paths mixes naive and aware datetimes.
+            busy_slots = []
+            for doc in docs:
+                session = doc.to_dict()
+                start = _align_tz(session["dateTime"], day_start)
+                end = start + timedelta(minutes=session.get("durationMinutes", 60))
+                busy_slots.append((start, end))
+
+            bitmask_slots = self._available_slots_bitmask(
+                day_start, busy_slots, duration_minutes
+            )
+            if bitmask_slots is not None:
+                return bitmask_slots
+
+            if np is not None and busy_slots:
+                return self._available_slots_np(
+                    day_start, day_end, busy_slots, duration_minutes
+                )
+            return self._available_slots_sweep(
+                day_start, day_end, busy_slots, duration_minutes
+            )
+        except Exception as e:
+            logger.warning("Error getting available slots: %s", e)
+            return []
+
+    @staticmethod
+    def _available_slots_sweep(
+        day_start: datetime,
+        day_end: datetime,
+        busy_slots: List[tuple],
+        duration_minutes: int,
+    ) -> List[datetime]:
+        """Two-pointer sweep over sorted busy intervals.
+
+        Candidate slots and busy intervals are both in start order, so
+        one forward pass over each suffices: advance past intervals that
+        end before the candidate, then the only interval that can
+        conflict is the next one. O(slots + sessions) instead of
+        rescanning every busy interval per slot. Endpoints must share
+        day_start's tz-awareness (get_available_slots aligns them).
+        """
+        busy_slots = sorted(busy_slots, key=lambda interval: interval[0])
+        available_slots = []
+        busy_index = 0
+        busy_count = len(busy_slots)
+        duration = timedelta(minutes=duration_minutes)
+        step = timedelta(minutes=30)
+        current_time = day_start
+        while current_time + duration <= day_end:
+            slot_end = current_time + duration
+            while (
+                busy_index < busy_count
+                and busy_slots[busy_index][1] <= current_time
+            ):
+                busy_index += 1
+            if not (
+                busy_index < busy_count
+                and busy_slots[busy_index][0] < slot_end
+            ):
+                available_slots.append(current_time)
+            current_time += step
+        return available_slots
+
+    @staticmethod
+    def _available_slots_bitmask(
+        day_start: datetime,
+        busy_slots: List[tuple],
+        duration_minutes: int,
+    ) -> Optional[List[datetime]]:
+        """Bit-per-slot conflict check for grid-aligned days.
+
+        Each of the 18 half-hour cells is one bit of an int: busy
+        intervals OR their cell range in, and a candidate of d cells is
+        free when d consecutive bits are clear - tested for the whole
+        grid at once by ANDing shifted copies of the free mask. Only
+        exact when the duration and every busy boundary sit on the
+        30-minute grid (the normal case, since bookings come off this
+        same grid); returns None otherwise so the caller falls back to
+        the interval-based paths. Endpoints are aligned with day_start's
+        tz-awareness first - aware Firestore values against the agent's
+        naive dates raised TypeError here, which the caller's blanket
+        except turned into "no openings" on any day with a booking.
+        """
+        if duration_minutes % 30:
+            return None
+        duration_cells = duration_minutes // 30
+        busy = 0
+        for start, end in busy_slots:
+            start_s = (_align_tz(start, day_start) - day_start).total_seconds()
+            end_s = (_align_tz(end, day_start) - day_start).total_seconds()
+            if start_s % _SLOT_SECONDS or end_s % _SLOT_SECONDS:
+                return None
+            start_idx = max(int(start_s) // _SLOT_SECONDS, 0)
+            end_idx = min(int(end_s) // _SLOT_SECONDS, _SLOT_COUNT)
+            if end_idx > start_idx:
+                busy |= (1 << end_idx) - (1 << start_idx)
+
+        free = ~busy & ((1 << _SLOT_COUNT) - 1)
+        candidates = free
+        for shift in range(1, duration_cells):
+            candidates &= free >> shift
+        # A candidate must also fit before closing time
+        candidates &= (1 << (_SLOT_COUNT - duration_cells + 1)) - 1
+
+        available_slots = []
+        while candidates:
+            idx = (candidates & -candidates).bit_length() - 1
+            available_slots.append(
+                day_start + timedelta(seconds=idx * _SLOT_SECONDS)
+            )
+            candidates &= candidates - 1
+        return available_slots
+
+    @staticmethod
+    def _available_slots_np(
+        day_start: datetime,
+        day_end: datetime,
+        busy_slots: List[tuple],
+        duration_minutes: int,
+    ) -> List[datetime]:
+        """Vectorized conflict check over the whole slot grid at once.
+
+        Intervals become int64 second offsets from day_start and the
+        slots x sessions overlap test is a single broadcast expression,
+        so busy days stay out of the Python interpreter loop. Only used
+        when NumPy is importable; results match the sweep exactly.
+        Endpoints are aligned with day_start's tz-awareness here as well
+        so the offset subtraction never mixes naive and aware values,
+        whichever caller built the list.
+        """
+        count = len(busy_slots)
+        starts = np.fromiter(
+            (
+                int((_align_tz(s, day_start) - day_start).total_seconds())
+                for s, _ in busy_slots
+            ),
+            dtype=np.int64,
+            count=count,
+        )
+        ends = np.fromiter(
+            (
+                int((_align_tz(e, day_start) - day_start).total_seconds())
+                for _, e in busy_slots
+            ),
+            dtype=np.int64,
+            count=count,
+        )
+        duration_s = duration_minutes * 60
+        day_span_s = int((day_end - day_start).total_seconds())
+        slot_starts = np.arange(0, day_span_s - duration_s + 1, 1800, dtype=np.int64)
+        conflicts = (
+            (slot_starts[:, None] < ends[None, :])
+            & ((slot_starts + duration_s)[:, None] > starts[None, :])
+        ).any(axis=1)
+        return [
+            day_start + timedelta(seconds=int(offset))
+            for offset in slot_starts[~conflicts]
+        ]
+
+    def update_session_status(self, session_id: str, status: str) -> bool:
+        try:
+            self.sessions_ref.document(session_id).update(
+                {"status": status, "updatedAt": datetime.now(UTC)}
+            )
+            return True
+        except Exception as e:
+            logger.warning("Error updating session status: %s", e)
+            return False
+
+    def cancel_session(self, session_id: str) -> bool:
+        try:
+            self.sessions_ref.document(session_id).update(
+                {"status": "cancelled", "updatedAt": datetime.now(UTC)}
+            )
+            return True
+        except Exception as e:
+            logger.warning("Error cancelling session: %s", e)
+            return False
+
+    def reschedule_session(self, session_id: str, new_time: datetime) -> bool:
+        try:
+            self.sessions_ref.document(session_id).update(
+                {
+                    "dateTime": new_time,
+                    "autoReminderSent": False,
+                    "updatedAt": datetime.now(UTC),
+                }
+            )
+            return True
+        except Exception as e:
+            logger.warning("Error rescheduling session: %s", e)
+            return False
+
+    def mark_reminders_sent(
+        self, session_ids: List[str], method: str = "phone"
+    ) -> bool:
+        """Mark a whole batch of sessions as reminded in one commit.
+
+        The reminder worker finishes a sweep with up to N successful
+        calls; one WriteBatch per 500 ids (the Firestore batch limit)
+        replaces N individual update RPCs.
+        """
+        try:
+            now = datetime.now(UTC)
+            update = {
+                "autoReminderSent": True,
+                "lastReminderMethod": method,
+                "reminderSentAt": now,
+                "updatedAt": now,
+            }
+            for chunk_start in range(0, len(session_ids), _MAX_BATCH_OPS):
+                batch = self.db.batch()
+                for session_id in session_ids[
+                    chunk_start : chunk_start + _MAX_BATCH_OPS
+                ]:
+                    batch.update(self.sessions_ref.document(session_id), update)
+                batch.commit()
+            return True
+        except Exception as e:
+            logger.warning("Error marking reminders sent: %s", e)
+            return False
+
+    def mark_reminder_sent(self, session_id: str, method: str = "phone") -> bool:
+        try:
+            now = datetime.now(UTC)
+            self.sessions_ref.document(session_id).update(
+                {
+                    "autoReminderSent": True,
+                    "lastReminderMethod": method,
+                    "reminderSentAt": now,
+                    "updatedAt": now,
+                }
+            )
+            return True
+        except Exception as e:
+            logger.warning("Error marking reminder sent: %s", e)
+            return False
+
+
+# Shared manager instance used by the session agent, the API and the caller
+session_manager = SessionManager()